@@ -0,0 +1,131 @@
+import time
+from typing import List
+
+import numpy as np
+
+from model.graph import Graph
+
+# bitsets of more nodes make every branch too slow, the greedy clique is kept instead
+MAX_CLIQUE_NODES = 4096
+# nodes whose candidate neighbors are counted between two deadline checks of the pivot scan
+PIVOT_SCAN_CHECK = 256
+# int.bit_count is new in python 3.10, the Pipfile still allows 3.9
+_HAS_BIT_COUNT = hasattr(int, "bit_count")
+
+
+def greedy_clique(graph: Graph) -> List[int]:
+    """
+    Builds a clique greedily: starting from the node of highest degree, the candidate of highest
+    degree is added while candidates adjacent to every clique node remain. Its size is a lower
+    bound on the number of colors.
+
+    Args:
+        graph (Graph): graph to search.
+
+    Returns:
+        clique (list): nodes of the clique.
+    """
+    if graph.node_count == 0:
+        return []
+    adjacency = [set(neighbors) for neighbors in graph.adjacency_lists()]
+    degree = graph.degree.tolist()
+
+    node = max(range(graph.node_count), key=degree.__getitem__)
+    clique = [node]
+    candidates = adjacency[node]
+    while candidates:
+        node = max(candidates, key=degree.__getitem__)
+        clique.append(node)
+        candidates = candidates & adjacency[node]
+    return clique
+
+
+def max_clique(
+    graph: Graph, time_limit: float = None, max_calls: int = 100000
+) -> List[int]:
+    """
+    Searches a maximum clique with Bron-Kerbosch branching on integer bitsets, starting from the
+    greedy clique. Only nodes of degree at least the greedy clique size can be in a larger clique,
+    so the bitsets span those nodes alone; when more than MAX_CLIQUE_NODES remain the greedy
+    clique is returned. Branches that cannot beat the best clique are pruned, and the search
+    stops after max_calls branches or time_limit seconds, so the result is always a clique but is
+    only maximum when the search ends on its own.
+
+    Args:
+        graph (Graph): graph to search.
+        time_limit (float): wall-clock limit in seconds.
+        max_calls (int): limit on number of branches explored.
+
+    Returns:
+        clique (list): nodes of the largest clique found.
+    """
+    best = greedy_clique(graph)
+    deadline = None if time_limit is None else time.monotonic() + time_limit
+
+    def expired() -> bool:
+        return deadline is not None and time.monotonic() > deadline
+
+    nodes = np.flatnonzero(graph.degree >= len(best))
+    if len(nodes) > MAX_CLIQUE_NODES or expired():
+        return best
+    # bit i of a bitset stands for nodes[i]
+    bit_of = np.full(graph.node_count, -1, dtype=np.int64)
+    bit_of[nodes] = np.arange(len(nodes))
+    neighbor_bits = []
+    for node in nodes.tolist():
+        bits = 0
+        for bit in bit_of[graph.neighbors(node)].tolist():
+            if bit >= 0:
+                bits |= 1 << bit
+        neighbor_bits.append(bits)
+
+    calls = 0
+    # stack of (clique so far, candidate bitset)
+    stack = [([], (1 << len(nodes)) - 1)]
+    while stack:
+        calls += 1
+        if calls > max_calls or expired():
+            break
+
+        clique, candidates = stack.pop()
+        if not candidates:
+            if len(clique) > len(best):
+                best = nodes[clique].tolist()
+            continue
+        if len(clique) + _popcount(candidates) <= len(best):
+            continue
+
+        # pivot with most candidate neighbors, only its non-neighbors need a branch
+        pivot, pivot_count = -1, -1
+        for scanned, node in enumerate(_bit_positions(candidates)):
+            if scanned % PIVOT_SCAN_CHECK == PIVOT_SCAN_CHECK - 1 and expired():
+                return best
+            count = _popcount(candidates & neighbor_bits[node])
+            if count > pivot_count:
+                pivot, pivot_count = node, count
+        branches = candidates & ~neighbor_bits[pivot]
+        for node in _bit_positions(branches):
+            stack.append((clique + [node], candidates & neighbor_bits[node]))
+            candidates &= ~(1 << node)
+    return best
+
+
+def _popcount(bits: int) -> int:
+    """
+    Number of set bits of bits.
+    """
+    if _HAS_BIT_COUNT:
+        return bits.bit_count()
+    return bin(bits).count("1")
+
+
+def _bit_positions(bits: int) -> List[int]:
+    """
+    Positions of set bits of bits, lowest first.
+    """
+    positions = []
+    while bits:
+        lowest = bits & -bits
+        positions.append(lowest.bit_length() - 1)
+        bits ^= lowest
+    return positions
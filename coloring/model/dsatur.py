@@ -0,0 +1,70 @@
+import heapq
+from typing import List, Tuple
+
+from utils import SolverSummary
+from model.graph import Graph
+
+
+class DSaturColoring:
+    """
+    Create DSatur heuristic that colors nodes in order of saturation degree (number of distinct
+    colors among neighbors), ties broken by degree. Colors used by neighbors of each node are kept as
+    an integer bitset, so saturation update and lowest free color are O(1).
+    """
+
+    def __init__(self, graph: Graph) -> None:
+        self.graph = graph
+
+    def _solve(self) -> Tuple[SolverSummary, List[int]]:
+        """
+        Activate coloring process. Uncolored nodes are kept in buckets by saturation, each bucket is
+        a heap on degree rank; entries left behind when a node moves to a higher bucket are skipped
+        lazily, so selecting the next node is amortized O(1) bucket lookups.
+
+        Returns:
+            solver_result (SolverSummary): summary of solver status.
+            colors (list): color of each node.
+        """
+        node_count = self.graph.node_count
+        adjacency = self.graph.adjacency_lists()
+        degree = self.graph.degree.tolist()
+
+        # rank 0 is the node of highest degree
+        rank = [0] * node_count
+        for position, node in enumerate(
+            sorted(range(node_count), key=degree.__getitem__, reverse=True)
+        ):
+            rank[node] = position
+
+        colors = [-1] * node_count
+        neighbor_colors = [0] * node_count
+        saturation = [0] * node_count
+        buckets = [[] for _ in range(max(degree, default=0) + 2)]
+        buckets[0] = sorted((rank[node], node) for node in range(node_count))
+        top = 0
+
+        for _ in range(node_count):
+            while True:
+                while not buckets[top]:
+                    top -= 1
+                _, node = heapq.heappop(buckets[top])
+                if colors[node] < 0 and saturation[node] == top:
+                    break
+
+            used = neighbor_colors[node]
+            # lowest zero bit of used is the smallest color free among neighbors
+            color = (~used & (used + 1)).bit_length() - 1
+            colors[node] = color
+            bit = 1 << color
+
+            for neighbor in adjacency[node]:
+                if colors[neighbor] < 0 and not neighbor_colors[neighbor] & bit:
+                    neighbor_colors[neighbor] |= bit
+                    level = saturation[neighbor] + 1
+                    saturation[neighbor] = level
+                    heapq.heappush(buckets[level], (rank[neighbor], neighbor))
+                    if level > top:
+                        top = level
+
+        solver_result = SolverSummary(solver="dsatur", termination_condition="feasible")
+        return solver_result, colors
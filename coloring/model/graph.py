@@ -0,0 +1,63 @@
+import numpy as np
+
+
+class Graph:
+    """
+    Undirected graph stored as CSR arrays: neighbors of node v are indices[indptr[v]:indptr[v + 1]].
+    Duplicate edges and self loops of input are dropped.
+    """
+
+    def __init__(self, edges: np.ndarray, node_count: int) -> None:
+        self.node_count = node_count
+        self.indptr, self.indices = Graph._to_csr(edges, node_count)
+        self.degree = np.diff(self.indptr)
+
+    @staticmethod
+    def _to_csr(edges: np.ndarray, node_count: int):
+        """
+        Builds CSR arrays from edge array.
+
+        Args:
+            edges (np.ndarray): int64 array of shape (edge_count, 2), one edge per row.
+            node_count (int): number of nodes.
+
+        Returns:
+            indptr (np.ndarray): start of neighbors of each node in indices, length node_count + 1.
+            indices (np.ndarray): neighbors of every node, sorted by node.
+        """
+        edges = edges[edges[:, 0] != edges[:, 1]]
+        # both directions encoded as a single sortable key
+        keys = np.unique(
+            np.concatenate(
+                [
+                    edges[:, 0] * node_count + edges[:, 1],
+                    edges[:, 1] * node_count + edges[:, 0],
+                ]
+            )
+        )
+        sources, indices = np.divmod(keys, node_count)
+        indptr = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=node_count), out=indptr[1:])
+        return indptr, indices
+
+    def edges(self) -> np.ndarray:
+        """
+        Returns every edge once as int64 array of shape (edge_count, 2), smaller node first.
+        """
+        sources = np.repeat(np.arange(self.node_count), self.degree)
+        once = sources < self.indices
+        return np.stack([sources[once], self.indices[once]], axis=1)
+
+    def neighbors(self, node: int) -> np.ndarray:
+        """
+        Returns neighbors of node as a view of CSR indices.
+        """
+        return self.indices[self.indptr[node] : self.indptr[node + 1]]
+
+    def adjacency_lists(self) -> list:
+        """
+        Returns neighbors of every node as python lists, for loops that run node by node.
+        """
+        indices = self.indices.tolist()
+        bounds = self.indptr.tolist()
+        return [indices[bounds[v] : bounds[v + 1]] for v in range(self.node_count)]
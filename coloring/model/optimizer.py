@@ -0,0 +1,143 @@
+from typing import List, Tuple
+
+import pyomo.environ as pyo
+
+from common.pyomo_optimizer import PyomoOptimizer
+from utils import SolverSummary
+from model.graph import Graph
+
+
+class ColoringOptimizer(PyomoOptimizer):
+    """
+    Create exact graph coloring optimizer as a MIP model. Only as many colors as a heuristic
+    coloring uses are declared, so model size is nodes x colors of heuristic. Clique nodes are fixed
+    to the first colors and color usage is ordered to break symmetry; clique size bounds the
+    objective from below.
+    """
+
+    sense = pyo.minimize
+
+    def __init__(self, graph: Graph, colors: List[int], clique: List[int]) -> None:
+        """
+        Args:
+            graph (Graph): graph to color.
+            colors (list): valid heuristic coloring, number of colors used is the upper bound.
+            clique (list): nodes of a clique, its size is the lower bound.
+        """
+        self.graph = graph
+        self.clique = clique
+        self.colors = ColoringOptimizer._align_to_clique(colors, clique)
+        self.color_count = max(self.colors, default=-1) + 1
+        self.model = self.construct_model()
+
+    @staticmethod
+    def _align_to_clique(colors: List[int], clique: List[int]) -> List[int]:
+        """
+        Renames colors so that clique node i gets color i and used colors are 0 to k - 1, which
+        makes heuristic coloring feasible for the symmetry breaking constraints.
+        """
+        mapping = {colors[node]: position for position, node in enumerate(clique)}
+        for color in colors:
+            if color not in mapping:
+                mapping[color] = len(mapping)
+        return [mapping[color] for color in colors]
+
+    def construct_model(self) -> pyo.ConcreteModel:
+        """
+        Constructs pyomo concrete model object including creates variable, constraints and adding objective.
+        The variable x[v, c] is binary variable represents whether node v gets color c, y[c] whether
+        color c is used.
+
+        Returns:
+            model (pyo.ConcreteModel): concrete model object contain variables, objective and constrain.
+        """
+        nodes = range(self.graph.node_count)
+        colors = range(self.color_count)
+
+        model = ColoringOptimizer.init_concrete_model()
+        model.x = pyo.Var(nodes, colors, within=pyo.Binary)
+        model.y = pyo.Var(colors, within=pyo.Binary)
+        model.obj.expr = pyo.quicksum(model.y[c] for c in colors)
+
+        for v in nodes:
+            model.con.add(expr=pyo.quicksum(model.x[v, c] for c in colors) == 1)
+            for c in colors:
+                model.con.add(expr=model.x[v, c] <= model.y[c])
+        for u, v in self.graph.edges().tolist():
+            for c in colors:
+                model.con.add(expr=model.x[u, c] + model.x[v, c] <= model.y[c])
+
+        # symmetry breaking: colors are used in order and clique nodes take the first colors
+        for c in colors[1:]:
+            model.con.add(expr=model.y[c - 1] >= model.y[c])
+        for position, node in enumerate(self.clique):
+            model.x[node, position].fix(1)
+        model.con.add(expr=model.obj.expr >= len(self.clique))
+        return model
+
+    def _incumbent(self) -> dict:
+        """
+        Heuristic coloring as values of model variables.
+        """
+        x = {
+            (v, c): int(self.colors[v] == c)
+            for v in range(self.graph.node_count)
+            for c in range(self.color_count)
+        }
+        y = dict.fromkeys(range(self.color_count), 1)
+        return {"x": x, "y": y}
+
+    def _solve(
+        self, solver: str = "glpk", time_limit: float = None, mip_gap: float = None
+    ) -> Tuple[SolverSummary, List[int]]:
+        """
+        Activate optimization process. Answer is flagged optimal only when lower bound, either the
+        clique size or the bound proven by solver, meets the number of colors used.
+
+        Args:
+            solver (str): name of solver that will be used in optimization process.
+            time_limit (float): wall-clock limit in seconds given to solver.
+            mip_gap (float): relative gap at which solver may stop.
+
+        Returns:
+            solver_result (SolverSummary): summary of solver status.
+            colors (list): color of each node.
+        """
+        if len(self.clique) == self.color_count:
+            return (
+                SolverSummary(solver="clique", termination_condition="optimal"),
+                self.colors,
+            )
+
+        solver_result = ColoringOptimizer.run_solver(
+            self.model,
+            solver,
+            time_limit=time_limit,
+            mip_gap=mip_gap,
+            incumbent=self._incumbent(),
+        )
+        colors = [
+            next(
+                c
+                for c in range(self.color_count)
+                if pyo.value(self.model.x[v, c]) > 0.5
+            )
+            for v in range(self.graph.node_count)
+        ]
+        # rename used colors to 0 .. k - 1
+        mapping = {
+            color: position for position, color in enumerate(sorted(set(colors)))
+        }
+        colors = [mapping[color] for color in colors]
+
+        proven = (
+            solver_result.solver.termination_condition
+            == pyo.TerminationCondition.optimal
+        )
+        color_count = max(colors, default=-1) + 1
+        optimal = proven or len(self.clique) == color_count
+        termination_condition = "optimal" if optimal else "feasible"
+        return (
+            SolverSummary(solver=solver, termination_condition=termination_condition),
+            colors,
+        )
@@ -0,0 +1,245 @@
+import threading
+import time
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from utils import SolverSummary
+from model.graph import Graph
+
+
+class TabuColoring:
+    """
+    Create TabuCol improvement phase for a valid coloring. The highest color is dropped, its nodes are
+    moved to their least conflicting color and conflicts are repaired by tabu search; on success the
+    next color is dropped. A node x color table counts neighbors of each node in each color, so a
+    move is scored by two table lookups and applied by updating the rows of the node's neighbors.
+    Conflicting nodes are kept in an indexed set updated from the same neighbors, so no move
+    rescans every node.
+    """
+
+    def __init__(
+        self,
+        graph: Graph,
+        colors: List[int],
+        time_limit: float = None,
+        max_iterations: int = None,
+        seed: int = 0,
+        lower_bound: int = 1,
+        callback: Callable[[List[int]], None] = None,
+        cancel: threading.Event = None,
+    ) -> None:
+        """
+        Args:
+            graph (Graph): graph to color.
+            colors (list): valid coloring to improve.
+            time_limit (float): wall-clock limit in seconds.
+            max_iterations (int): limit on total tabu moves, for runs without time_limit.
+            seed (int): seed of random tie breaking and tabu tenure.
+            lower_bound (int): proven lower bound on colors (e.g. clique size), search stops when
+                it is reached and the coloring is flagged optimal.
+            callback (callable): called with every valid coloring using one color less.
+            cancel (threading.Event): search stops with the best coloring once it is set.
+        """
+        self.graph = graph
+        self.colors = np.asarray(colors, dtype=np.int64)
+        self.time_limit = time_limit
+        self.max_iterations = max_iterations
+        self.rng = np.random.default_rng(seed)
+        self.lower_bound = lower_bound
+        self.callback = callback
+        self.cancel = cancel
+
+    def _conflict_table(self, colors: np.ndarray, color_count: int) -> np.ndarray:
+        """
+        Counts neighbors of every node in every color.
+
+        Args:
+            colors (np.ndarray): color of each node.
+            color_count (int): number of columns of the table.
+
+        Returns:
+            table (np.ndarray): int64 array of shape (node_count, color_count).
+        """
+        sources = np.repeat(np.arange(self.graph.node_count), self.graph.degree)
+        keys = sources * color_count + colors[self.graph.indices]
+        table = np.bincount(keys, minlength=self.graph.node_count * color_count)
+        return table.reshape(self.graph.node_count, color_count)
+
+    @staticmethod
+    def _update_conflicting(
+        affected: np.ndarray,
+        colors: np.ndarray,
+        table: np.ndarray,
+        members: np.ndarray,
+        position: np.ndarray,
+        size: int,
+    ) -> int:
+        """
+        Swap-removes nodes of affected that lost their last conflict from the indexed set
+        members[:size] and appends those that gained one.
+
+        Args:
+            affected (np.ndarray): nodes whose own color count may have changed.
+            colors (np.ndarray): color of each node.
+            table (np.ndarray): conflict table of colors.
+            members (np.ndarray): conflicting nodes in their first size entries, changed in place.
+            position (np.ndarray): index of each node in members, -1 outside, changed in place.
+            size (int): number of conflicting nodes.
+
+        Returns:
+            size (int): number of conflicting nodes after the update.
+        """
+        conflicting = table[affected, colors[affected]] > 0
+        outside = position[affected] < 0
+        for node in affected[~conflicting & ~outside].tolist():
+            size -= 1
+            index, last = int(position[node]), int(members[size])
+            members[index] = last
+            position[last] = index
+            position[node] = -1
+
+        added = affected[conflicting & outside]
+        members[size : size + len(added)] = added
+        position[added] = np.arange(size, size + len(added))
+        return size + len(added)
+
+    def _repair(
+        self,
+        colors: np.ndarray,
+        table: np.ndarray,
+        color_count: int,
+        deadline: float,
+        iterations: int,
+    ) -> Tuple[bool, int]:
+        """
+        Runs tabu search on colors in place until no edge is in conflict.
+
+        Args:
+            colors (np.ndarray): color of each node, changed in place.
+            table (np.ndarray): conflict table of colors, changed in place.
+            color_count (int): colors allowed, 0 to color_count - 1.
+            deadline (float): time.monotonic() value at which search stops.
+            iterations (int): moves left before search stops.
+
+        Returns:
+            repaired (bool): whether a coloring without conflict was reached.
+            iterations (int): moves left.
+        """
+        nodes = np.arange(self.graph.node_count)
+        tabu_until = np.zeros((self.graph.node_count, color_count), dtype=np.int64)
+        table = table[:, :color_count]
+        own = table[nodes, colors]
+        conflicts = int(own.sum()) // 2
+        # indexed set of conflicting nodes: members[:size], position of each node or -1
+        members = np.flatnonzero(own > 0)
+        size = len(members)
+        members = np.concatenate([members, np.zeros(len(nodes) - size, dtype=np.int64)])
+        position = np.full(len(nodes), -1, dtype=np.int64)
+        position[members[:size]] = np.arange(size)
+        best_conflicts = conflicts
+        # larger than any real delta, which is bounded by node degree
+        blocked = self.graph.node_count + 1
+        step = 0
+
+        while conflicts > 0:
+            if iterations <= 0:
+                return False, iterations
+            if step % 128 == 0 and (
+                time.monotonic() > deadline
+                or (self.cancel is not None and self.cancel.is_set())
+            ):
+                return False, iterations
+            step += 1
+            iterations -= 1
+
+            conflicting = members[:size]
+            own = table[conflicting, colors[conflicting]]
+            delta = table[conflicting] - own[:, None]
+            delta[np.arange(len(conflicting)), colors[conflicting]] = blocked
+            # tabu moves are allowed only when they beat the best conflict count seen
+            forbidden = (tabu_until[conflicting] > step) & (
+                conflicts + delta >= best_conflicts
+            )
+            delta[forbidden] = blocked
+
+            best_delta = delta.min()
+            if best_delta == blocked:
+                continue
+            candidates = np.flatnonzero(delta.ravel() == best_delta)
+            row, new_color = divmod(int(self.rng.choice(candidates)), color_count)
+            node = int(conflicting[row])
+            old_color = int(colors[node])
+
+            neighbors = self.graph.neighbors(node)
+            table[neighbors, old_color] -= 1
+            table[neighbors, new_color] += 1
+            colors[node] = new_color
+            conflicts += int(best_delta)
+            best_conflicts = min(best_conflicts, conflicts)
+            tabu_until[node, old_color] = (
+                step + int(0.6 * len(conflicting)) + int(self.rng.integers(0, 10))
+            )
+            # only the node and its neighbors of the old or new color change own conflicts
+            neighbor_colors = colors[neighbors]
+            affected = np.append(
+                neighbors[
+                    (neighbor_colors == old_color) | (neighbor_colors == new_color)
+                ],
+                node,
+            )
+            size = TabuColoring._update_conflicting(
+                affected, colors, table, members, position, size
+            )
+
+        return True, iterations
+
+    def _solve(self) -> Tuple[SolverSummary, List[int]]:
+        """
+        Activate improvement process, best valid coloring found is kept at every moment.
+
+        Returns:
+            solver_result (SolverSummary): summary of solver status.
+            colors (list): color of each node.
+        """
+        deadline = (
+            float("inf")
+            if self.time_limit is None
+            else time.monotonic() + self.time_limit
+        )
+        iterations = self.max_iterations if self.max_iterations is not None else 10**12
+        best = self.colors.copy()
+        color_count = int(best.max()) + 1 if len(best) else 0
+
+        colors = best.copy()
+        table = self._conflict_table(colors, max(color_count, 1))
+        lower_bound = max(self.lower_bound, 1)
+        while (
+            color_count > lower_bound and time.monotonic() < deadline and iterations > 0
+        ):
+            color_count -= 1
+            dropped = np.flatnonzero(colors == color_count)
+            for node in dropped.tolist():
+                new_color = int(np.argmin(table[node, :color_count]))
+                neighbors = self.graph.neighbors(node)
+                table[neighbors, colors[node]] -= 1
+                table[neighbors, new_color] += 1
+                colors[node] = new_color
+
+            repaired, iterations = self._repair(
+                colors, table, color_count, deadline, iterations
+            )
+            if not repaired:
+                break
+            best = colors.copy()
+            if self.callback is not None:
+                self.callback(best.tolist())
+
+        best_count = int(best.max()) + 1 if len(best) else 0
+        termination_condition = (
+            "optimal" if best_count <= self.lower_bound else "feasible"
+        )
+        solver_result = SolverSummary(
+            solver="tabu", termination_condition=termination_condition
+        )
+        return solver_result, best.tolist()
@@ -1,43 +1,167 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
+import queue
+import threading
+import time
+from typing import Callable, Iterator
 
-def solve_it(input_data):
-    # Modify this code to run your optimization algorithm
+from utils import Incumbent, SolverSummary, format_input, format_output
+from model.graph import Graph
+from model.dsatur import DSaturColoring
+from model.tabu import TabuColoring
+from model.clique import max_clique
 
-    # parse the input
-    lines = input_data.split('\n')
+METHODS = ("heuristic", "mip")
 
-    first_line = lines[0].split()
-    node_count = int(first_line[0])
-    edge_count = int(first_line[1])
 
-    edges = []
-    for i in range(1, edge_count + 1):
-        line = lines[i]
-        parts = line.split()
-        edges.append((int(parts[0]), int(parts[1])))
+def _incumbent(output_data: str, bound: int, start: float) -> Incumbent:
+    """
+    Describes output_data as an Incumbent, the bound of an optimal answer is its color count.
+    """
+    objective, optimal = output_data.split("\n", 1)[0].split()
+    objective, optimal = int(objective), optimal == "1"
+    if optimal:
+        bound = objective
+    return Incumbent(
+        objective=objective,
+        bound=bound,
+        gap=(objective - bound) / max(objective, 1),
+        elapsed=time.monotonic() - start,
+        optimal=optimal,
+        output_data=output_data,
+    )
 
-    # build a trivial solution
-    # every node has its own color
-    solution = range(0, node_count)
 
-    # prepare the solution in the specified output format
-    output_data = str(node_count) + ' ' + str(0) + '\n'
-    output_data += ' '.join(map(str, solution))
+def solve_it(
+    input_data: str,
+    time_limit: float = 10.0,
+    method: str = "heuristic",
+    callback: Callable[[Incumbent], None] = None,
+    cancel: threading.Event = None,
+) -> str:
+    """
+    Solving graph coloring problem for given input_data.
+
+    Args:
+        input_data (str): input data of nodes and edges of graph.
+        time_limit (float): wall-clock limit in seconds of tabu search improving DSatur coloring,
+            "mip" gives half of it to tabu search and the rest to the solver.
+        method (str): "heuristic" for DSatur and tabu search, "mip" to continue with exact model
+            seeded by the heuristic coloring.
+        callback (callable): called with an Incumbent for the DSatur coloring, for every coloring
+            tabu search improves it to and once more for the returned answer.
+        cancel (threading.Event): tabu search stops with its best coloring once it is set, and the
+            exact model is skipped.
+
+    Returns:
+        output_data (str): number of colors used and color of each node.
+    """
+    if method not in METHODS:
+        raise ValueError(f"unknown method {method!r}, expected one of {METHODS}")
+
+    start = time.monotonic()
+    edges, summary_graph = format_input(input_data)
+    graph = Graph(edges, summary_graph["total_nodes"])
+
+    # clique size proves a lower bound, any search stops as soon as it is reached
+    clique = max_clique(
+        graph, time_limit=min(1.0, 0.1 * time_limit) if time_limit else None
+    )
+
+    def report(colors: list) -> None:
+        if callback is not None:
+            output_data = format_output(
+                colors, SolverSummary(solver=method, termination_condition="feasible")
+            )
+            callback(_incumbent(output_data, len(clique), start))
+
+    heuristic_time_limit = (
+        time_limit / 2 if method == "mip" and time_limit else time_limit
+    )
+    solver_summary, colors = DSaturColoring(graph)._solve()
+    if max(colors, default=-1) + 1 <= len(clique):
+        solver_summary = SolverSummary(solver="dsatur", termination_condition="optimal")
+    elif heuristic_time_limit:
+        report(colors)
+        solver_summary, colors = TabuColoring(
+            graph,
+            colors,
+            heuristic_time_limit,
+            lower_bound=len(clique),
+            callback=report,
+            cancel=cancel,
+        )._solve()
+
+    cancelled = cancel is not None and cancel.is_set()
+    if (
+        method == "mip"
+        and solver_summary.termination_condition != "optimal"
+        and not cancelled
+    ):
+        from model.optimizer import ColoringOptimizer
+
+        optimizer = ColoringOptimizer(graph, colors, clique)
+        solver_summary, colors = optimizer._solve(
+            time_limit=time_limit - heuristic_time_limit if time_limit else None
+        )
 
+    # prepare the solution in the specified output format
+    output_data = format_output(colors, solver_summary)
+    if callback is not None:
+        callback(_incumbent(output_data, len(clique), start))
     return output_data
 
 
-import sys
+def solve_iter(input_data: str, **kwargs) -> Iterator[Incumbent]:
+    """
+    Anytime variant of solve_it. The search runs in a background thread and every improving
+    coloring is yielded as an Incumbent as soon as it is found; the last one is the answer of
+    solve_it. Closing the generator, e.g. by leaving a for loop early, cancels tabu search at its
+    next check.
+
+    Args:
+        input_data (str): input data of nodes and edges of graph.
+        kwargs: keyword arguments of solve_it other than callback and cancel.
+
+    Yields:
+        incumbent (Incumbent): color count, clique lower bound, relative gap, seconds since start,
+            optimal flag and output data of the coloring.
+    """
+    incumbents = queue.Queue()
+    cancel = threading.Event()
+
+    def search() -> None:
+        try:
+            solve_it(input_data, callback=incumbents.put, cancel=cancel, **kwargs)
+            incumbents.put(None)
+        except Exception as error:
+            incumbents.put(error)
 
-if __name__ == '__main__':
+    threading.Thread(target=search, daemon=True).start()
+    try:
+        while True:
+            incumbent = incumbents.get()
+            if incumbent is None:
+                return
+            if isinstance(incumbent, Exception):
+                raise incumbent
+            yield incumbent
+    finally:
+        cancel.set()
+
+
+if __name__ == "__main__":
     import sys
+
     if len(sys.argv) > 1:
         file_location = sys.argv[1].strip()
-        with open(file_location, 'r') as input_data_file:
+        with open(file_location, "r") as input_data_file:
             input_data = input_data_file.read()
-        print(solve_it(input_data))
+        time_limit = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+        method = sys.argv[3].strip() if len(sys.argv) > 3 else "heuristic"
+        print(solve_it(input_data, time_limit, method))
     else:
-        print('This test requires an input file.  Please select one from the data directory. (i.e. python solver.py ./data/gc_4_1)')
-
+        print(
+            "This test requires an input file.  Please select one from the data directory. (i.e. python solver.py ./data/gc_4_1 [time_limit] [heuristic|mip])"
+        )
@@ -6,6 +6,7 @@ from __future__ import print_function
 import json
 import time
 import os
+import multiprocessing
 from collections import namedtuple
 
 
@@ -24,6 +25,7 @@ try:
     from urllib.parse import urlparse, urlencode
     from urllib.request import urlopen, Request
     from urllib.error import HTTPError
+    from multiprocessing.connection import wait
 except:
     pass
 
@@ -136,7 +138,7 @@ def part_prompt(problems):
         return selected_problems
 
 
-def compute(metadata, solver_file_override=None):
+def compute(metadata, solver_file_override=None, jobs=None, timeout=None):
     '''
     Determines which assignment parts the student would like to submit.
     Then computes his/her answers to those assignment parts
@@ -145,6 +147,10 @@ def compute(metadata, solver_file_override=None):
         metadata:  the assignment metadata
         solver_file_override:  an optional model file to override the metadata 
             default
+        jobs:  an optional number of parts solved at once in separate processes,
+            parts are solved one by one in this interpreter when neither jobs
+            nor timeout is given
+        timeout:  an optional limit in seconds on the wall time of each part
 
     Returns:
         a dictionary of results in the format Coursera expects
@@ -160,6 +166,8 @@ def compute(metadata, solver_file_override=None):
     #submission needs empty dict for every assignment part
     results.update({prob_data.id : {} for prob_data in metadata.part_data})
 
+    batch = jobs is not None or timeout is not None
+    tasks = []
     for problem in selected_problems:
         if solver_file_override != None:
             solver_file = solver_file_override
@@ -178,10 +186,18 @@ def compute(metadata, solver_file_override=None):
             sys.path.insert(0, path)
             solver_file = file_name
 
+        if batch:
+            tasks.append((problem, solver_file))
+            continue
+
         submission = output(problem.input_file, solver_file)
         if submission != None:
             results[problem.id] = {'output':submission}
 
+    if len(tasks) > 0:
+        for part_id, submission in batch_output(tasks, jobs or 1, timeout).items():
+            results[part_id] = {'output':submission}
+
     print('\n== Computations Complete ...')
 
     return results
@@ -239,6 +255,150 @@ def output(input_file, solver_file):
     return solution.strip() + '\n' + str(end - start)
 
 
+def batch_worker(connection, part_id, input_file, solver_file):
+    '''
+    Executes solve_it on a given input file in a child process of
+    batch_output and sends the outcome on connection. When the solver file
+    also has the anytime solve_iter, every improving answer is sent as well,
+    so batch_output can submit the best one when the part times out.
+
+    Args:
+        connection: the sending end of a pipe of this part only, read by
+            batch_output; terminating the process can only break this pipe
+        part_id: the id of the assignment part
+        input_file: the assignment problem data of interest
+        solver_file: a python file containing the solve_it function
+    '''
+
+    wall_start = time.time()
+    start = process_time()
+    try:
+        pkg = __import__(solver_file[:-3]) # remove '.py' extension
+    except ImportError as e:
+        connection.send((part_id, 'final', None, 'import error with python file "%s".\n%s' % (solver_file, e), 0.0, 0.0))
+        return
+    if not hasattr(pkg, 'solve_it'):
+        connection.send((part_id, 'final', None, 'the solve_it() function was not found in %s' % solver_file, 0.0, 0.0))
+        return
+
+    message = ''
+    try:
+        if hasattr(pkg, 'solve_iter'):
+            for incumbent in pkg.solve_iter(load_input_data(input_file)):
+                solution = incumbent.output_data
+                connection.send((part_id, 'incumbent', solution, '', time.time() - wall_start, process_time() - start))
+        else:
+            solution = pkg.solve_it(load_input_data(input_file))
+    except Exception as e:
+        message = 'the solve_it(input_data) method from solver.py raised an exception\n' \
+                  'exception message:\n' + str(e)
+        solution = 'Local Exception =('
+    end = process_time()
+    wall_end = time.time()
+
+    if not (isinstance(solution, str) or isinstance(solution, unicode)):
+        message = 'Warning: the solver did not return a string.  The given object will be converted with the str() method.'
+        solution = str(solution)
+
+    connection.send((part_id, 'final', solution, message, wall_end - wall_start, end - start))
+
+
+def batch_output(tasks, jobs, timeout=None):
+    '''
+    Attempts to execute solve_it on many input files at once, each in its own
+    process. Submissions are printed as soon as each part finishes. A part
+    still running after timeout seconds is stopped, and the best answer it
+    reported so far is submitted, if any.
+
+    Args:
+        tasks: a list of (problem, solver_file) pairs
+        jobs: the number of parts solved at the same time
+        timeout: an optional limit in seconds on the wall time of each part
+
+    Returns:
+        a dictionary of submission strings by part id, in the format that
+        output returns
+    '''
+
+    pending = list(tasks)
+    # part id -> (process, problem, start time, receiving end of its pipe)
+    running = {}
+    submissions = {}
+    incumbents = {}
+    timings = []
+
+    while len(pending) > 0 or len(running) > 0:
+        while len(pending) > 0 and len(running) < jobs:
+            problem, solver_file = pending.pop(0)
+            # not a daemon, solvers may start processes of their own
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=batch_worker,
+                args=(sender, problem.id, problem.input_file, solver_file))
+            process.start()
+            # only the child writes, so the pipe reports EOF once it exits
+            sender.close()
+            running[problem.id] = (process, problem, time.time(), receiver)
+
+        ready = wait([entry[3] for entry in running.values()], timeout=0.1)
+        for part_id, (process, problem, start, receiver) in list(running.items()):
+            if receiver not in ready:
+                continue
+            try:
+                part_id, kind, solution, message, wall, cpu = receiver.recv()
+            except EOFError:
+                # the process died without a final answer
+                del running[part_id]
+                receiver.close()
+                process.join()
+                print('\n== %s: solver process exited with code %d, part skipped' % (problem.name, process.exitcode))
+                timings.append((problem.name, time.time() - start, None))
+                continue
+
+            if kind == 'incumbent':
+                incumbents[part_id] = (solution, wall, cpu)
+            elif kind == 'final':
+                del running[part_id]
+                receiver.close()
+                process.join()
+                print('\n== %s: wall %.2f s, cpu %.2f s' % (problem.name, wall, cpu))
+                if message != '':
+                    print(message)
+                if solution is None:
+                    timings.append((problem.name, wall, None))
+                else:
+                    print('Submitting: ')
+                    print(solution)
+                    submissions[part_id] = solution.strip() + '\n' + str(cpu)
+                    timings.append((problem.name, wall, cpu))
+
+        now = time.time()
+        for part_id, (process, problem, start, receiver) in list(running.items()):
+            if timeout is not None and now - start > timeout:
+                process.terminate()
+                process.join()
+                receiver.close()
+                del running[part_id]
+                if part_id not in incumbents:
+                    print('\n== %s: timed out after %.1f seconds, part skipped' % (problem.name, timeout))
+                    timings.append((problem.name, now - start, None))
+                    continue
+                solution, wall, cpu = incumbents[part_id]
+                print('\n== %s: timed out after %.1f seconds, best answer found after %.2f s' % (problem.name, timeout, wall))
+                print('Submitting: ')
+                print(solution)
+                submissions[part_id] = solution.strip() + '\n' + str(cpu)
+                timings.append((problem.name, now - start, cpu))
+
+    print('\n== Part Timings ...')
+    for name, wall, cpu in timings:
+        if cpu is None:
+            print('  %s: wall %.2f s, no output' % (name, wall))
+        else:
+            print('  %s: wall %.2f s, cpu %.2f s' % (name, wall, cpu))
+
+    return submissions
+
+
 def login_dialog(assignment_key, results, credentials_file_location = '_credentials'):
     '''
     Requests Coursera login credentials from the student and submits the 
@@ -387,7 +547,7 @@ def main(args):
     print('==\n== '+metadata.name+' Solution Submission \n==')
     
     # compute dialog
-    results = compute(metadata, args.override)
+    results = compute(metadata, args.override, args.jobs, args.timeout)
 
     if sum(['output' in v for k,v in results.items()]) <= 0:
         return
@@ -450,6 +610,12 @@ def build_parser():
     parser.add_argument('-rs', '--record_submission', 
         help='records the submission(s) as files', action='store_true')
 
+    parser.add_argument('-j', '--jobs', type=int,
+        help='solves the selected parts in parallel, using this many processes')
+
+    parser.add_argument('-t', '--timeout', type=float,
+        help='stops any part still running after this many seconds, implies a batch run')
+
     return parser
 
 
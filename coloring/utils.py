@@ -0,0 +1,123 @@
+import io
+from collections import namedtuple
+from typing import List, Tuple
+
+import numpy as np
+
+SolverSummary = namedtuple("SolverSummary", ["solver", "termination_condition"])
+# improving coloring reported while the search runs, gap is relative to the lower bound
+Incumbent = namedtuple(
+    "Incumbent", ["objective", "bound", "gap", "elapsed", "optimal", "output_data"]
+)
+
+
+def _split_numbers(numbers: np.ndarray) -> Tuple[np.ndarray, dict]:
+    """
+    Splits flat array of numbers of an input file into edges and summary.
+
+    Args:
+        numbers (np.ndarray): every integer of input file in reading order.
+
+    Returns:
+        edges (np.ndarray): int64 array of shape (edge_count, 2), one edge per row.
+        summary_graph (dict): dictionary contains summary information of input.
+    """
+    node_count, edge_count = int(numbers[0]), int(numbers[1])
+    summary_graph = {"total_nodes": node_count, "total_edges": edge_count}
+
+    edges = numbers[2 : 2 + 2 * edge_count].reshape(edge_count, 2)
+    return edges, summary_graph
+
+
+def format_input(input_data: str) -> Tuple[np.ndarray, dict]:
+    """
+    Transform input_data into edge array, the whole input is converted in one bulk call.
+
+    Args:
+        input_data (str): string of input data extracted from the raw file.
+
+    Returns:
+        edges (np.ndarray): int64 array of shape (edge_count, 2), one edge per row.
+        summary_graph (dict): dictionary contains summary information of input.
+    """
+    numbers = np.fromstring(input_data, dtype=np.int64, sep=" ")
+    return _split_numbers(numbers)
+
+
+def format_input_file(file_location: str) -> Tuple[np.ndarray, dict]:
+    """
+    Same as format_input but parses file directly in numpy, so large instances are never
+    copied into a python str.
+
+    Args:
+        file_location (str): path of input file.
+
+    Returns:
+        edges (np.ndarray): int64 array of shape (edge_count, 2), one edge per row.
+        summary_graph (dict): dictionary contains summary information of input.
+    """
+    numbers = np.fromfile(file_location, dtype=np.int64, sep=" ")
+    return _split_numbers(numbers)
+
+
+def _join_ints(numbers: np.ndarray) -> np.ndarray:
+    """
+    Formats non-negative integers as space separated decimal ASCII without python int objects.
+    Digits of every number are placed into one byte array, one digit position at a time.
+
+    Args:
+        numbers (np.ndarray): non-negative integers.
+
+    Returns:
+        line (np.ndarray): uint8 array of ASCII codes of the numbers joined by spaces.
+    """
+    numbers = np.asarray(numbers, dtype=np.int64)
+    if len(numbers) == 0:
+        return np.zeros(0, dtype=np.uint8)
+    digits = np.ones(len(numbers), dtype=np.int64)
+    power = 10
+    while power <= numbers.max():
+        digits += numbers >= power
+        power *= 10
+
+    # each number is followed by a space, the last space is cut off
+    ends = np.cumsum(digits + 1) - 1
+    line = np.full(ends[-1], ord(" "), dtype=np.uint8)
+    remainder = numbers.copy()
+    for position in range(int(digits.max())):
+        present = digits > position
+        line[ends[present] - 1 - position] = remainder[present] % 10 + ord("0")
+        remainder //= 10
+    return line
+
+
+def write_output(colors: np.ndarray, solver_summary: SolverSummary, stream) -> None:
+    """
+    Writes final output data to a binary stream in one pass.
+
+    Args:
+        colors (np.ndarray): color of each node.
+        solver_summary (SolverSummary): summary of solver status.
+        stream (BinaryIO): file object opened in binary mode, e.g. sys.stdout.buffer.
+    """
+    colors = np.asarray(colors, dtype=np.int64)
+    optimal = 1 if solver_summary.termination_condition == "optimal" else 0
+    color_count = int(colors.max()) + 1 if len(colors) else 0
+    stream.write(f"{color_count} {optimal}\n".encode())
+    stream.write(_join_ints(colors).data)
+
+
+def format_output(colors: List[int], solver_summary: SolverSummary) -> str:
+    """
+    Preparing final output data.
+
+    Args:
+        colors (list): color of each node.
+        solver_summary (SolverSummary): summary of solver status.
+
+    Returns:
+        output_data (str): number of colors and optimal flag, then color of each node.
+    """
+    buffer = io.BytesIO()
+    write_output(colors, solver_summary, buffer)
+    return buffer.getvalue().decode("ascii")
@@ -0,0 +1,286 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import argparse
+from typing import Iterator, Tuple
+
+import numpy as np
+
+# items or candidate edges generated at once, bounds memory independently of instance size
+CHUNK_SIZE = 2**16
+
+KNAPSACK_FAMILIES = ("uncorrelated", "weak", "strong", "subset_sum")
+COLORING_FAMILIES = ("gnp", "geometric", "flat")
+
+
+def knapsack_chunks(
+    family: str, item_count: int, seed: int, data_range: int
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Generates items of a classic (Pisinger) knapsack family chunk by chunk. The same arguments
+    always yield the same chunks.
+
+    Args:
+        family (str): one of KNAPSACK_FAMILIES, "weak" and "strong" are the weakly and strongly
+            correlated families.
+        item_count (int): number of items.
+        seed (int): seed of the random generator.
+        data_range (int): weights are drawn from 1 to data_range.
+
+    Yields:
+        values (np.ndarray): value of each item of the chunk.
+        weights (np.ndarray): weight of each item of the chunk.
+    """
+    rng = np.random.default_rng(seed)
+    spread = max(1, data_range // 10)
+    for start in range(0, item_count, CHUNK_SIZE):
+        size = min(CHUNK_SIZE, item_count - start)
+        weights = rng.integers(1, data_range, size, endpoint=True)
+        if family == "uncorrelated":
+            values = rng.integers(1, data_range, size, endpoint=True)
+        elif family == "weak":
+            values = np.maximum(
+                1, weights + rng.integers(-spread, spread, size, endpoint=True)
+            )
+        elif family == "strong":
+            values = weights + spread
+        elif family == "subset_sum":
+            values = weights
+        else:
+            raise ValueError(
+                f"unknown family {family!r}, expected one of {KNAPSACK_FAMILIES}"
+            )
+        yield values, weights
+
+
+def _triangle_edges(
+    rng: np.random.Generator, node_count: int, probability: float
+) -> Iterator[np.ndarray]:
+    """
+    Samples every pair of nodes independently with probability by geometric jumps over the linear
+    index of the upper triangle of the adjacency matrix, so only sampled edges are materialized.
+
+    Yields:
+        edges (np.ndarray): int64 array of shape (chunk, 2), smaller node first.
+    """
+    pair_count = node_count * (node_count - 1) // 2
+    if probability <= 0 or pair_count == 0:
+        return
+    # pairs of row u start at row_start[u]
+    rows = np.arange(node_count, dtype=np.int64)
+    row_start = rows * (2 * node_count - rows - 1) // 2
+    position = -1
+    while True:
+        if probability >= 1:
+            positions = np.arange(position + 1, position + 1 + CHUNK_SIZE)
+        else:
+            positions = position + np.cumsum(rng.geometric(probability, CHUNK_SIZE))
+        positions = positions[positions < pair_count]
+        if len(positions) == 0:
+            return
+        position = int(positions[-1])
+        sources = np.searchsorted(row_start, positions, side="right") - 1
+        targets = positions - row_start[sources] + sources + 1
+        yield np.stack([sources, targets], axis=1)
+
+
+def _geometric_edges(
+    rng: np.random.Generator, node_count: int, density: float
+) -> Iterator[np.ndarray]:
+    """
+    Joins nodes at random points of the unit square closer than the radius that gives expected
+    degree density * (node_count - 1). Nodes are bucketed in a grid of cells at least one radius
+    wide, so only pairs in the same or adjacent cells are compared.
+
+    Yields:
+        edges (np.ndarray): int64 array of shape (chunk, 2), smaller node first.
+    """
+    radius = np.sqrt(density * max(node_count - 1, 0) / np.pi / max(node_count, 1))
+    side = max(
+        1, min(int(1 / radius) if radius > 0 else 1, int(np.sqrt(node_count)) + 1)
+    )
+    points = rng.random((node_count, 2))
+    cells = np.minimum((points * side).astype(np.int64), side - 1)
+    keys = cells[:, 1] * side + cells[:, 0]
+    # nodes are numbered by cell, so the nodes of a cell are a range
+    order = np.argsort(keys, kind="stable")
+    points, cells, keys = points[order], cells[order], keys[order]
+    cell_start = np.searchsorted(keys, np.arange(side * side + 1))
+
+    # the cell itself and the adjacent cells not visited from an earlier cell
+    offsets = ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+    for start in range(0, node_count, CHUNK_SIZE // 16):
+        sources = np.arange(start, min(node_count, start + CHUNK_SIZE // 16))
+        chunks = []
+        for dx, dy in offsets:
+            x, y = cells[sources, 0] + dx, cells[sources, 1] + dy
+            inside = (x >= 0) & (x < side) & (y < side)
+            near = y[inside] * side + x[inside]
+            counts = cell_start[near + 1] - cell_start[near]
+            pair_sources = np.repeat(sources[inside], counts)
+            within = np.arange(counts.sum()) - np.repeat(
+                np.cumsum(counts) - counts, counts
+            )
+            pair_targets = np.repeat(cell_start[near], counts) + within
+            if dx == 0 and dy == 0:
+                once = pair_sources < pair_targets
+                pair_sources, pair_targets = pair_sources[once], pair_targets[once]
+            delta = points[pair_sources] - points[pair_targets]
+            close = (delta**2).sum(axis=1) < radius**2
+            chunks.append(np.stack([pair_sources[close], pair_targets[close]], axis=1))
+        edges = np.concatenate(chunks)
+        yield np.sort(edges, axis=1)
+
+
+def coloring_chunks(
+    family: str,
+    node_count: int,
+    seed: int,
+    density: float,
+    colors: int,
+) -> Iterator[np.ndarray]:
+    """
+    Generates edges of a random graph family chunk by chunk. The same arguments always yield the
+    same chunks.
+
+    Args:
+        family (str): "gnp" for G(n, p) with p = density, "geometric" for nodes at random points of
+            the unit square joined below the distance that gives expected degree
+            density * (node_count - 1), "flat" for pairs of different classes of a hidden
+            colors-partition joined with probability density, so the graph is colors-colorable.
+        node_count (int): number of nodes.
+        seed (int): seed of the random generator.
+        density (float): edge probability, or expected relative degree of "geometric".
+        colors (int): number of hidden classes of "flat".
+
+    Yields:
+        edges (np.ndarray): int64 array of shape (chunk, 2), every edge once.
+    """
+    rng = np.random.default_rng(seed)
+    if family == "gnp":
+        yield from _triangle_edges(rng, node_count, density)
+    elif family == "flat":
+        hidden = rng.permutation(node_count) % colors
+        # same class pairs are dropped, so they are sampled at the raised rate of the others
+        probability = min(1.0, density * colors / (colors - 1)) if colors > 1 else 0.0
+        for edges in _triangle_edges(rng, node_count, probability):
+            yield edges[hidden[edges[:, 0]] != hidden[edges[:, 1]]]
+    elif family == "geometric":
+        yield from _geometric_edges(rng, node_count, density)
+    else:
+        raise ValueError(
+            f"unknown family {family!r}, expected one of {COLORING_FAMILIES}"
+        )
+
+
+def write_knapsack(
+    path: str,
+    family: str,
+    item_count: int,
+    seed: int = 0,
+    data_range: int = 10**4,
+    capacity_ratio: float = 0.5,
+) -> None:
+    """
+    Writes knapsack instance in the format of knapsack/utils.format_input. The first pass over the
+    chunks sums weights for the capacity line, the second pass regenerates and writes them.
+
+    Args:
+        path (str): output file location.
+        family (str): one of KNAPSACK_FAMILIES.
+        item_count (int): number of items.
+        seed (int): seed of the random generator.
+        data_range (int): weights are drawn from 1 to data_range.
+        capacity_ratio (float): capacity as share of total weight.
+    """
+    total_weight = sum(
+        int(weights.sum())
+        for _, weights in knapsack_chunks(family, item_count, seed, data_range)
+    )
+    with open(path, "w") as output_file:
+        output_file.write(f"{item_count} {int(capacity_ratio * total_weight)}\n")
+        for values, weights in knapsack_chunks(family, item_count, seed, data_range):
+            np.savetxt(output_file, np.stack([values, weights], axis=1), fmt="%d")
+
+
+def write_coloring(
+    path: str,
+    family: str,
+    node_count: int,
+    seed: int = 0,
+    density: float = 0.1,
+    colors: int = 10,
+) -> None:
+    """
+    Writes graph in the format of coloring/utils.format_input. The first pass over the chunks
+    counts edges for the header, the second pass regenerates and writes them.
+
+    Args:
+        path (str): output file location.
+        family (str): one of COLORING_FAMILIES.
+        node_count (int): number of nodes.
+        seed (int): seed of the random generator.
+        density (float): edge probability, or expected relative degree of "geometric".
+        colors (int): number of hidden classes of "flat".
+    """
+    edge_count = sum(
+        len(edges)
+        for edges in coloring_chunks(family, node_count, seed, density, colors)
+    )
+    with open(path, "w") as output_file:
+        output_file.write(f"{node_count} {edge_count}\n")
+        for edges in coloring_chunks(family, node_count, seed, density, colors):
+            np.savetxt(output_file, edges, fmt="%d")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Builds an argument parser for the generator CLI.
+
+    Returns:
+        parser (argparse.ArgumentParser): an argparse parser
+    """
+    parser = argparse.ArgumentParser(
+        description="Seeded synthetic knapsack and coloring instances."
+    )
+    subparsers = parser.add_subparsers(dest="problem", required=True)
+
+    knapsack = subparsers.add_parser("knapsack")
+    knapsack.add_argument("family", choices=KNAPSACK_FAMILIES)
+    knapsack.add_argument("size", type=int, help="number of items")
+    knapsack.add_argument("--seed", type=int, default=0)
+    knapsack.add_argument("--range", type=int, default=10**4, dest="data_range")
+    knapsack.add_argument("--capacity-ratio", type=float, default=0.5)
+    knapsack.add_argument("-o", "--output", help="default ks_<size>_<family>_<seed>")
+
+    coloring = subparsers.add_parser("coloring")
+    coloring.add_argument("family", choices=COLORING_FAMILIES)
+    coloring.add_argument("size", type=int, help="number of nodes")
+    coloring.add_argument("--seed", type=int, default=0)
+    coloring.add_argument("--density", type=float, default=0.1)
+    coloring.add_argument("--colors", type=int, default=10)
+    coloring.add_argument("-o", "--output", help="default gc_<size>_<family>_<seed>")
+    return parser
+
+
+def main(args: argparse.Namespace) -> None:
+    if args.problem == "knapsack":
+        path = args.output or f"ks_{args.size}_{args.family}_{args.seed}"
+        write_knapsack(
+            path,
+            args.family,
+            args.size,
+            args.seed,
+            args.data_range,
+            args.capacity_ratio,
+        )
+    else:
+        path = args.output or f"gc_{args.size}_{args.family}_{args.seed}"
+        write_coloring(
+            path, args.family, args.size, args.seed, args.density, args.colors
+        )
+    print(path)
+
+
+if __name__ == "__main__":
+    main(build_parser().parse_args())
@@ -0,0 +1,128 @@
+import abc
+import math
+from typing import Dict, Tuple
+
+import pyomo.environ as pyo
+from pyomo.opt.results.results_ import SolverResults
+
+MIP_GAP_OPTIONS = {"glpk": "mipgap", "cbc": "ratioGap", "gurobi": "MIPGap"}
+
+
+class PyomoOptimizer(abc.ABC):
+    """
+    Base of optimizers that build a pyomo concrete model and solve it with an external solver.
+    Subclasses set sense and implement construct_model.
+    """
+
+    sense = pyo.maximize
+
+    @abc.abstractmethod
+    def construct_model(self) -> pyo.ConcreteModel:
+        """
+        Constructs pyomo concrete model object including variables, constraints and objective.
+        """
+
+    @classmethod
+    def init_concrete_model(cls) -> pyo.ConcreteModel:
+        """
+        Initiates concrete model object.
+
+        Returns:
+            model (pyo.ConcreteModel): an empty concrete model object.
+        """
+        model = pyo.ConcreteModel()
+        model.con = pyo.ConstraintList()
+        model.obj = pyo.Objective(expr=0, sense=cls.sense)
+        return model
+
+    @staticmethod
+    def run_solver(
+        model: pyo.ConcreteModel,
+        solver: str = "glpk",
+        time_limit: float = None,
+        mip_gap: float = None,
+        incumbent: Dict[str, dict] = None,
+        tee: bool = False,
+    ) -> SolverResults:
+        """
+        Activate optimization process, the solution is loaded into model variables.
+
+        Args:
+            model (pyo.ConcreteModel): concrete model object contain variables, objective and constrain.
+            solver (str): name of solver that will be used in optimization process.
+            time_limit (float): wall-clock limit in seconds given to solver.
+            mip_gap (float): relative gap at which solver may stop, result is then flagged optimal
+                only when the reported bounds meet.
+            incumbent (dict): feasible solution as values of each variable component by name. It is used
+                as warm start, for solvers without warm start (glpk) its objective is added as cutoff,
+                and it is left in model when solver does not find anything better within time_limit.
+            tee (bool): stream solver log to stdout.
+
+        Returns:
+            solver_result (SolverResults): pyomo object contains summary of solver log
+        """
+        opt = pyo.SolverFactory(solver)
+        if mip_gap is not None:
+            opt.options[MIP_GAP_OPTIONS.get(solver, "mipgap")] = mip_gap
+
+        solve_kwargs = {"tee": tee}
+        if time_limit is not None:
+            solve_kwargs["timelimit"] = max(1, int(time_limit))
+
+        incumbent_value = None
+        if incumbent is not None:
+            PyomoOptimizer._load_values(model, incumbent)
+            incumbent_value = pyo.value(model.obj)
+            if opt.warm_start_capable():
+                solve_kwargs["warmstart"] = True
+            elif model.obj.sense == pyo.maximize:
+                model.con.add(expr=model.obj.expr >= incumbent_value)
+            else:
+                model.con.add(expr=model.obj.expr <= incumbent_value)
+
+        solver_result = opt.solve(model, load_solutions=False, **solve_kwargs)
+        termination_condition = solver_result.solver.termination_condition
+        if (
+            mip_gap
+            and termination_condition == pyo.TerminationCondition.optimal
+            and not PyomoOptimizer._gap_closed(solver_result)
+        ):
+            # solver stopped within gap, optimality is not proven
+            solver_result.solver.termination_condition = (
+                pyo.TerminationCondition.feasible
+            )
+
+        if len(solver_result.solution) > 0:
+            model.solutions.load_from(solver_result)
+        if incumbent is not None:
+            worse = (pyo.value(model.obj) - incumbent_value) * (
+                1 if model.obj.sense == pyo.maximize else -1
+            ) < 0
+            if len(solver_result.solution) == 0 or worse:
+                PyomoOptimizer._load_values(model, incumbent)
+        return solver_result
+
+    @staticmethod
+    def _gap_closed(solver_result: SolverResults, tolerance: float = 1e-6) -> bool:
+        """
+        Checks whether lower and upper bound reported by solver meet, missing bounds count as open.
+        """
+        if len(solver_result.problem) == 0:
+            return False
+        problem = solver_result.problem[0]
+        lower, upper = problem.lower_bound, problem.upper_bound
+        try:
+            lower, upper = float(lower), float(upper)
+        except (TypeError, ValueError):
+            return False
+        if not (math.isfinite(lower) and math.isfinite(upper)):
+            return False
+        return upper - lower <= tolerance * max(1.0, abs(upper))
+
+    @staticmethod
+    def _load_values(model: pyo.ConcreteModel, values: Dict[str, dict]) -> None:
+        """
+        Sets values of variable components of model by component name.
+        """
+        for name, component_values in values.items():
+            model.component(name).set_values(component_values)
@@ -1,10 +1,19 @@
 import java.io.*;
+import java.nio.charset.StandardCharsets;
 import java.util.List;
 import java.util.ArrayList;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+import java.util.concurrent.TimeUnit;
 
 /**
  * The class <code>Solver</code> is an implementation of a greedy algorithm to solve the knapsack problem.
  *
+ * It runs once on an input file (-file=...) or as a long-lived worker (-worker) that reads framed
+ * requests from the standard input and writes framed answers to the standard output:
+ *   request: "<id> <length>\n" followed by length bytes of instance data
+ *   answer:  "<id> <ok|error> <length>\n" followed by length bytes of solution or error message
+ * Requests are solved in parallel, so answers may come back in a different order.
  */
 public class Solver {
     
@@ -13,6 +22,12 @@ public class Solver {
      */
     public static void main(String[] args) {
         try {
+            for(String arg : args){
+                if(arg.equals("-worker")){
+                    serve(System.in, System.out);
+                    return;
+                }
+            }
             solve(args);
         } catch (IOException e) {
             e.printStackTrace();
@@ -48,7 +63,13 @@ public class Solver {
             input.close();
         }
         
-        
+        System.out.println(solve(lines));
+    }
+
+    /**
+     * Solve the instance given as lines of input data, and return the solution in the specified output format
+     */
+    public static String solve(List<String> lines) {
         // parse the data in the file
         String[] firstLine = lines.get(0).split("\\s+");
         int items = Integer.parseInt(firstLine[0]);
@@ -82,10 +103,91 @@ public class Solver {
         }
         
         // prepare the solution in the specified output format
-        System.out.println(value+" 0");
+        StringBuilder output = new StringBuilder();
+        output.append(value).append(" 0\n");
         for(int i=0; i < items; i++){
-            System.out.print(taken[i]+" ");
+            output.append(taken[i]).append(' ');
+        }
+        return output.toString();
+    }
+
+    /**
+     * Serve framed requests until the standard input is closed
+     */
+    public static void serve(InputStream in, OutputStream out) throws IOException {
+        DataInputStream input = new DataInputStream(new BufferedInputStream(in));
+        final OutputStream output = new BufferedOutputStream(out);
+        ExecutorService pool = Executors.newFixedThreadPool(Runtime.getRuntime().availableProcessors());
+
+        try {
+            String header = null;
+            while ((header = readHeader(input)) != null){
+                String[] parts = header.split(" ");
+                final String id = parts[0];
+                byte[] payload = new byte[Integer.parseInt(parts[1])];
+                input.readFully(payload);
+                final String data = new String(payload, StandardCharsets.US_ASCII);
+
+                pool.execute(new Runnable() {
+                    public void run() {
+                        String status = "ok";
+                        String result;
+                        try {
+                            List<String> lines = new ArrayList<String>();
+                            for(String line : data.split("\r?\n")){
+                                lines.add(line);
+                            }
+                            result = solve(lines);
+                        } catch (Throwable e) {
+                            // errors such as OutOfMemoryError must still be answered, or the client waits forever
+                            status = "error";
+                            result = e.toString();
+                        }
+                        writeFrame(output, id, status, result);
+                    }
+                });
+            }
+        }
+        finally {
+            // answer requests already read before exiting
+            pool.shutdown();
+            try {
+                pool.awaitTermination(Long.MAX_VALUE, TimeUnit.SECONDS);
+            } catch (InterruptedException e) {
+                Thread.currentThread().interrupt();
+            }
+        }
+    }
+
+    /**
+     * Read one header line, null at the end of the stream
+     */
+    private static String readHeader(InputStream input) throws IOException {
+        StringBuilder header = new StringBuilder();
+        int c;
+        while ((c = input.read()) != '\n'){
+            if(c == -1)
+                return null;
+            header.append((char) c);
+        }
+        return header.toString();
+    }
+
+    /**
+     * Write one answer, frames of parallel requests are never interleaved
+     */
+    private static void writeFrame(OutputStream output, String id, String status, String payload) {
+        byte[] bytes = payload.getBytes(StandardCharsets.US_ASCII);
+        byte[] header = (id + " " + status + " " + bytes.length + "\n").getBytes(StandardCharsets.US_ASCII);
+        synchronized (output) {
+            try {
+                output.write(header);
+                output.write(bytes);
+                output.flush();
+            } catch (IOException e) {
+                // the client is gone, nobody is left to answer
+                System.exit(1);
+            }
         }
-        System.out.println("");        
     }
-}
\ No newline at end of file
+}
@@ -0,0 +1,536 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import argparse
+import csv
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List
+
+KNAPSACK_DIR = os.path.dirname(os.path.abspath(__file__))
+COLORING_DIR = os.path.join(os.path.dirname(KNAPSACK_DIR), "coloring")
+DATA_DIR = os.path.join(KNAPSACK_DIR, "data")
+PROBLEM_DIRS = {"knapsack": KNAPSACK_DIR, "coloring": COLORING_DIR}
+SUITE_METRICS = ("wall", "cpu", "peak_rss_mb")
+
+DP_CHILD = """
+import sys
+from utils import format_input
+from model.dynamic import DynamicOptimizer
+
+with open(sys.argv[1], "r") as input_data_file:
+    items, summary_items = format_input(input_data_file.read())
+DynamicOptimizer(items, summary_items, traceback=sys.argv[2])._solve()
+"""
+
+SOLVE_CHILD = """
+import json
+import sys
+from solver import solve_it
+
+with open(sys.argv[1], "r") as input_data_file:
+    input_data = input_data_file.read()
+print(solve_it(input_data, **json.loads(sys.argv[2])))
+"""
+
+
+def list_data_files(data_dir: str = DATA_DIR) -> List[str]:
+    """
+    Lists knapsack input files sorted by item count.
+
+    Args:
+        data_dir (str): directory contains knapsack input files.
+
+    Returns:
+        file_locations (list): path of every input file in data_dir.
+    """
+    file_locations = []
+    for file_name in os.listdir(data_dir):
+        file_location = os.path.join(data_dir, file_name)
+        with open(file_location, "r") as input_data_file:
+            item_count, capacity = map(int, input_data_file.readline().split())
+        file_locations.append((item_count, capacity, file_location))
+    return [file_location for _, _, file_location in sorted(file_locations)]
+
+
+def run_child(code: str, *args: str, cwd: str = KNAPSACK_DIR) -> dict:
+    """
+    Runs python code in a fresh interpreter and collects its own resource usage. CPU time includes
+    processes the child waited for, e.g. glpsol started by pyomo.
+
+    Args:
+        code (str): python source executed with `python -c`.
+        args (str): extra command line arguments given to code.
+        cwd (str): working directory of the child, which makes its modules importable.
+
+    Returns:
+        usage (dict): wall time in seconds, cpu time in seconds, peak RSS in MB, return code and
+            standard output of the child.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", code, *args],
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    stdout = process.stdout.read()
+    _, status, rusage = os.wait4(process.pid, 0)
+    wall = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    process.stdout.close()
+    return {
+        "wall": wall,
+        "cpu": rusage.ru_utime + rusage.ru_stime,
+        # ru_maxrss is in kilobytes on linux
+        "peak_rss_mb": rusage.ru_maxrss / 1024,
+        "returncode": process.returncode,
+        "stdout": stdout,
+    }
+
+
+def benchmark_memory(file_locations: List[str], tracebacks: List[str]) -> None:
+    """
+    Prints peak RSS of dynamic programming engine against item count.
+
+    Args:
+        file_locations (list): knapsack input files.
+        tracebacks (list): traceback modes of DynamicOptimizer to compare.
+    """
+    print(
+        f"{'file':<20}{'items':>8}{'capacity':>12}{'traceback':>11}{'rss MB':>10}{'wall s':>9}"
+    )
+    for file_location in file_locations:
+        with open(file_location, "r") as input_data_file:
+            item_count, capacity = map(int, input_data_file.readline().split())
+        for traceback in tracebacks:
+            usage = run_child(DP_CHILD, file_location, traceback)
+            status = "" if usage["returncode"] == 0 else f"  exit {usage['returncode']}"
+            print(
+                f"{os.path.basename(file_location):<20}{item_count:>8}{capacity:>12}"
+                f"{traceback:>11}{usage['peak_rss_mb']:>10.1f}{usage['wall']:>9.2f}{status}"
+            )
+
+
+def benchmark_build(file_locations: List[str], solver: str = "glpk") -> None:
+    """
+    Prints build and solve time of LinearOptimizer with per-item expressions against the fast
+    build from coefficient arrays. Solve time is skipped when solver is not installed.
+
+    Args:
+        file_locations (list): knapsack input files.
+        solver (str): name of solver that will be used in optimization process.
+    """
+    import pyomo.environ as pyo
+
+    from model.optimizer import LinearOptimizer
+    from utils import format_input_file
+
+    solver_available = pyo.SolverFactory(solver).available(exception_flag=False)
+    print(
+        f"{'file':<20}{'items':>8}{'path':>7}{'build s':>10}{'write s':>10}{'solve s':>10}{'value':>12}"
+    )
+    for file_location in file_locations:
+        items, summary_items = format_input_file(file_location)
+        for path, fast_build in (("expr", False), ("fast", True)):
+            start = time.perf_counter()
+            optimizer = LinearOptimizer(items, summary_items, fast_build=fast_build)
+            build = time.perf_counter() - start
+
+            # writing LP file is the model generation part of every glpk call
+            start = time.perf_counter()
+            optimizer.model.write(
+                os.devnull, format="lp", io_options={"symbolic_solver_labels": False}
+            )
+            write = time.perf_counter() - start
+
+            solve, value = "n/a", "n/a"
+            if solver_available:
+                start = time.perf_counter()
+                optimizer._solve(optimizer.model, solver)
+                solve = f"{time.perf_counter() - start:.3f}"
+                value = str(int(round(pyo.value(optimizer.model.obj))))
+            print(
+                f"{os.path.basename(file_location):<20}{len(items):>8}{path:>7}"
+                f"{build:>10.3f}{write:>10.3f}{solve:>10}{value:>12}"
+            )
+
+
+def benchmark_suite(
+    tasks: List[tuple], repeat: int = 3, time_limit: float = None
+) -> List[dict]:
+    """
+    Runs solve_it of every task in a fresh interpreter several times and prints one line per run.
+
+    Args:
+        tasks (list): (problem, file_location, method) of each benchmark, problem is a key of
+            PROBLEM_DIRS.
+        repeat (int): runs of each task.
+        time_limit (float): time limit given to solve_it.
+
+    Returns:
+        runs (list): dictionary of each run with task, repetition, resource usage, objective value
+            and optimal flag, value and optimal are None when the child failed.
+    """
+    print(
+        f"{'problem':<10}{'file':<20}{'method':>10}{'run':>5}{'wall s':>9}{'cpu s':>9}"
+        f"{'rss MB':>9}{'value':>12}{'opt':>5}"
+    )
+    runs = []
+    for problem, file_location, method in tasks:
+        kwargs = {"method": method, "time_limit": time_limit}
+        if problem == "knapsack":
+            # a cached answer would measure the cache instead of the solver
+            kwargs["use_cache"] = False
+        for repetition in range(repeat):
+            usage = run_child(
+                SOLVE_CHILD,
+                file_location,
+                json.dumps(kwargs),
+                cwd=PROBLEM_DIRS[problem],
+            )
+            value, optimal = None, None
+            if usage["returncode"] == 0:
+                value, optimal = usage["stdout"].split("\n", 1)[0].split()
+                value, optimal = int(value), optimal == "1"
+            run = {
+                "problem": problem,
+                "file": os.path.basename(file_location),
+                "method": method,
+                "repetition": repetition,
+                "wall": usage["wall"],
+                "cpu": usage["cpu"],
+                "peak_rss_mb": usage["peak_rss_mb"],
+                "value": value,
+                "optimal": optimal,
+                "returncode": usage["returncode"],
+            }
+            runs.append(run)
+            status = (
+                f"{value:>12}{int(optimal):>5}"
+                if value is not None
+                else f"  exit {usage['returncode']}"
+            )
+            print(
+                f"{problem:<10}{run['file']:<20}{method:>10}{repetition:>5}"
+                f"{run['wall']:>9.2f}{run['cpu']:>9.2f}{run['peak_rss_mb']:>9.1f}{status}"
+            )
+    return runs
+
+
+def summarize_runs(runs: List[dict]) -> dict:
+    """
+    Aggregates repetitions of each task, median of resource usage and worst objective.
+
+    Args:
+        runs (list): runs returned by benchmark_suite.
+
+    Returns:
+        summary (dict): statistics of each task keyed by "problem/file/method".
+    """
+    grouped = {}
+    for run in runs:
+        key = f"{run['problem']}/{run['file']}/{run['method']}"
+        grouped.setdefault(key, []).append(run)
+
+    summary = {}
+    for key, task_runs in grouped.items():
+        finished = [run for run in task_runs if run["value"] is not None]
+        summary[key] = {
+            metric: statistics.median(run[metric] for run in task_runs)
+            for metric in SUITE_METRICS
+        }
+        summary[key]["failed"] = len(task_runs) - len(finished)
+        # knapsack maximizes, coloring minimizes colors
+        worst = min if task_runs[0]["problem"] == "knapsack" else max
+        summary[key]["value"] = (
+            worst(run["value"] for run in finished) if finished else None
+        )
+        summary[key]["optimal"] = bool(finished) and all(
+            run["optimal"] for run in finished
+        )
+    return summary
+
+
+def write_results(path: str, runs: List[dict], summary: dict) -> None:
+    """
+    Writes runs and summary as JSON, or runs alone as CSV when path ends with .csv.
+
+    Args:
+        path (str): output file location.
+        runs (list): runs returned by benchmark_suite.
+        summary (dict): summary returned by summarize_runs.
+    """
+    with open(path, "w", newline="") as output_file:
+        if path.endswith(".csv"):
+            writer = csv.DictWriter(output_file, fieldnames=list(runs[0]))
+            writer.writeheader()
+            writer.writerows(runs)
+        else:
+            json.dump({"runs": runs, "summary": summary}, output_file, indent=2)
+
+
+def compare_baseline(summary: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Compares summary against the summary of a stored JSON result. A task regresses when a resource
+    metric grows by more than threshold, its objective gets worse, it loses optimality or it fails.
+
+    Args:
+        summary (dict): summary returned by summarize_runs.
+        baseline (dict): summary of the baseline run.
+        threshold (float): allowed relative growth of wall, cpu and peak RSS.
+
+    Returns:
+        regressions (list): description of every regression found.
+    """
+    regressions = []
+    for key, current in summary.items():
+        if key not in baseline:
+            continue
+        previous = baseline[key]
+        for metric in SUITE_METRICS:
+            if current[metric] > previous[metric] * (1 + threshold):
+                regressions.append(
+                    f"{key}: {metric} {previous[metric]:.3f} -> {current[metric]:.3f}"
+                )
+        if current["failed"] > previous["failed"]:
+            regressions.append(
+                f"{key}: failed runs {previous['failed']} -> {current['failed']}"
+            )
+        if current["value"] is not None and previous["value"] is not None:
+            better = min if key.startswith("coloring/") else max
+            if better(current["value"], previous["value"]) != current["value"]:
+                regressions.append(
+                    f"{key}: value {previous['value']} -> {current['value']}"
+                )
+        if previous["optimal"] and not current["optimal"]:
+            regressions.append(f"{key}: no longer optimal")
+    return regressions
+
+
+def import_profile(problem: str, module: str = "solver") -> List[tuple]:
+    """
+    Imports module in a fresh interpreter with `-X importtime`.
+
+    Args:
+        problem (str): key of PROBLEM_DIRS, the directory module is imported from.
+        module (str): name of the imported module.
+
+    Returns:
+        profile (list): (cumulative microseconds, self microseconds, nesting depth, module name) of
+            every imported module, in report order.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROBLEM_DIRS[problem],
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    profile = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        profile.append((int(cumulative), int(own), depth, name.strip()))
+    return profile
+
+
+def benchmark_startup(problem_files: dict, repeat: int = 5, top: int = 10) -> None:
+    """
+    Prints import time of solver with its heaviest modules, and wall time of solve_it on a tiny
+    instance run end to end in a fresh interpreter, the cost paid by every short job.
+
+    Args:
+        problem_files (dict): tiny input file of each problem.
+        repeat (int): runs measured, medians are printed.
+        top (int): heaviest modules listed.
+    """
+    kwargs = {
+        "knapsack": {"method": "dp", "use_cache": False},
+        "coloring": {"time_limit": 0},
+    }
+    for problem, file_location in problem_files.items():
+        profiles = [import_profile(problem) for _ in range(repeat)]
+        total = statistics.median(profile[-1][0] for profile in profiles)
+        walls = [
+            run_child(
+                SOLVE_CHILD,
+                os.path.abspath(file_location),
+                json.dumps(kwargs[problem]),
+                cwd=PROBLEM_DIRS[problem],
+            )["wall"]
+            for _ in range(repeat)
+        ]
+        empty = [run_child("pass")["wall"] for _ in range(repeat)]
+
+        print(f"== {problem}: {os.path.basename(file_location)}")
+        print(f"  empty interpreter  {statistics.median(empty) * 1000:>9.1f} ms")
+        print(f"  import solver      {total / 1000:>9.1f} ms")
+        print(f"  solve end to end   {statistics.median(walls) * 1000:>9.1f} ms")
+        print("  heaviest imports (cumulative ms, last run):")
+        for cumulative, _, depth, name in sorted(profiles[-1], reverse=True)[
+            1 : top + 1
+        ]:
+            print(f"    {cumulative / 1000:>9.1f}  {'  ' * depth}{name}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Builds an argument parser for the benchmark CLI.
+
+    Returns:
+        parser (argparse.ArgumentParser): an argparse parser
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks for knapsack solvers.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    memory = subparsers.add_parser(
+        "memory", help="peak RSS of dynamic programming against item count"
+    )
+    memory.add_argument("files", nargs="*", help="input files, default all of ./data")
+    memory.add_argument(
+        "--traceback",
+        nargs="+",
+        default=["table", "divide"],
+        choices=["table", "divide", "auto"],
+    )
+    memory.add_argument(
+        "--max-cells",
+        type=float,
+        default=2e10,
+        help="skip files whose items * capacity exceeds this",
+    )
+
+    build = subparsers.add_parser(
+        "build",
+        help="LinearOptimizer build and solve time, per-item expressions vs arrays",
+    )
+    build.add_argument("files", nargs="*", help="input files, default all of ./data")
+    build.add_argument("--solver", default="glpk")
+
+    startup = subparsers.add_parser(
+        "startup",
+        help="import time of solver modules and end to end time on a tiny instance",
+    )
+    startup.add_argument(
+        "files",
+        nargs="*",
+        help="tiny input files, ks_* are knapsack and gc_* coloring, default smallest of ./data",
+    )
+    startup.add_argument("--repeat", type=int, default=5)
+    startup.add_argument("--top", type=int, default=10)
+
+    suite = subparsers.add_parser(
+        "suite",
+        help="solve_it of each engine over knapsack and coloring data, with baseline comparison",
+    )
+    suite.add_argument(
+        "files",
+        nargs="*",
+        help="input files, ks_* are knapsack and gc_* coloring, default all data of --problems",
+    )
+    suite.add_argument(
+        "--problems", nargs="+", default=["knapsack", "coloring"], choices=PROBLEM_DIRS
+    )
+    suite.add_argument("--knapsack-methods", nargs="+", default=["dp", "core"])
+    suite.add_argument("--coloring-methods", nargs="+", default=["heuristic"])
+    suite.add_argument("--repeat", type=int, default=3)
+    suite.add_argument("--time-limit", type=float, default=10.0)
+    suite.add_argument("--output", help="write results to this .json or .csv file")
+    suite.add_argument(
+        "--baseline", help="JSON results of an earlier run to compare against"
+    )
+    suite.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative growth of wall, cpu or peak RSS reported as regression",
+    )
+    return parser
+
+
+def suite_tasks(args: argparse.Namespace) -> List[tuple]:
+    """
+    Lists (problem, file_location, method) of every benchmark selected on the command line.
+    """
+    if args.files:
+        problem_files = {
+            problem: [
+                file_location
+                for file_location in args.files
+                if os.path.basename(file_location).startswith(
+                    "ks_" if problem == "knapsack" else "gc_"
+                )
+            ]
+            for problem in args.problems
+        }
+    else:
+        problem_files = {}
+        for problem in args.problems:
+            data_dir = os.path.join(PROBLEM_DIRS[problem], "data")
+            if not os.path.isdir(data_dir):
+                print(f"{data_dir} not found, {problem} skipped")
+                continue
+            problem_files[problem] = list_data_files(data_dir)
+
+    methods = {"knapsack": args.knapsack_methods, "coloring": args.coloring_methods}
+    return [
+        (problem, os.path.abspath(file_location), method)
+        for problem, file_locations in problem_files.items()
+        for file_location in file_locations
+        for method in methods[problem]
+    ]
+
+
+def main(args: argparse.Namespace) -> None:
+    if args.command == "suite":
+        runs = benchmark_suite(suite_tasks(args), args.repeat, args.time_limit)
+        summary = summarize_runs(runs)
+        if args.output and runs:
+            write_results(args.output, runs, summary)
+        if args.baseline:
+            with open(args.baseline, "r") as baseline_file:
+                baseline = json.load(baseline_file)["summary"]
+            regressions = compare_baseline(summary, baseline, args.threshold)
+            for regression in regressions:
+                print(f"regression {regression}")
+            if regressions:
+                sys.exit(1)
+            print(f"no regression against {args.baseline}")
+        return
+
+    if args.command == "startup":
+        problem_files = {}
+        for file_location in args.files:
+            problem = (
+                "coloring"
+                if os.path.basename(file_location).startswith("gc_")
+                else "knapsack"
+            )
+            problem_files.setdefault(problem, file_location)
+        if not args.files:
+            problem_files["knapsack"] = list_data_files()[0]
+        benchmark_startup(problem_files, args.repeat, args.top)
+        return
+
+    file_locations = args.files or list_data_files()
+    if args.command == "memory":
+        selected = []
+        for file_location in file_locations:
+            with open(file_location, "r") as input_data_file:
+                item_count, capacity = map(int, input_data_file.readline().split())
+            if item_count * capacity <= args.max_cells:
+                selected.append(file_location)
+        benchmark_memory(selected, args.traceback)
+    elif args.command == "build":
+        benchmark_build(file_locations, args.solver)
+
+
+if __name__ == "__main__":
+    main(build_parser().parse_args())
@@ -0,0 +1,232 @@
+import glob
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # windows, writes stay atomic but concurrent updates are not serialized
+    fcntl = None
+
+KNAPSACK_DIR = os.path.dirname(os.path.abspath(__file__))
+# solve_it uses the cache by default only when this is set
+CACHE_DIR_ENV = "KNAPSACK_CACHE_DIR"
+CACHE_DIR = os.environ.get(CACHE_DIR_ENV) or os.path.join(
+    os.path.expanduser("~"), ".cache", "knapsack"
+)
+CACHE_MAX_BYTES = 64 * 2**20
+# any change of these files can change answers, so it starts a fresh cache generation
+SOURCE_PATTERNS = (
+    "solver.py",
+    "utils.py",
+    "reduction.py",
+    os.path.join("model", "*.py"),
+    os.path.join("..", "common", "*.py"),
+)
+OPTIMAL_SUFFIX = ".opt"
+INCUMBENT_SUFFIX = ".inc"
+# entries get the permissions of any new file, mkstemp alone would make them private
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def cache_enabled() -> bool:
+    """
+    Whether solve_it uses the cache when the caller does not say, i.e. the cache dir is set.
+    """
+    return bool(os.environ.get(CACHE_DIR_ENV))
+
+
+def solver_fingerprint() -> str:
+    """
+    Hashes the source of every module taking part in solve_it.
+
+    Returns:
+        fingerprint (str): hex digest of the solver source.
+    """
+    digest = hashlib.sha256()
+    for pattern in SOURCE_PATTERNS:
+        for path in sorted(glob.glob(os.path.join(KNAPSACK_DIR, pattern))):
+            with open(path, "rb") as source_file:
+                digest.update(source_file.read())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Content-addressed on-disk cache of solve_it outputs. An entry is keyed by hash of the input data,
+    the solver source and the solve configuration. Proven optimal answers are never replaced, a
+    non-optimal answer is replaced only by a better or optimal one. When the directory grows past
+    max_bytes the least recently used entries are evicted, non-optimal ones first. Entries are
+    written to a temporary file and renamed, and updates hold an exclusive lock, so parallel
+    processes can share one cache. A cache that cannot be read or written (read-only or foreign
+    directory) behaves as an empty one that stores nothing.
+    """
+
+    def __init__(
+        self, directory: str = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES
+    ) -> None:
+        """
+        Args:
+            directory (str): location of cache files, created when missing.
+            max_bytes (int): size of entries kept after eviction.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fingerprint = solver_fingerprint()
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError:
+            self.directory = None
+
+    def key(self, input_data: str, config: dict) -> str:
+        """
+        Builds entry key.
+
+        Args:
+            input_data (str): input data of items for selection in knapsack.
+            config (dict): json serializable options of solve_it that select the solver.
+
+        Returns:
+            key (str): hex digest naming the entry.
+        """
+        digest = hashlib.sha256(self.fingerprint.encode())
+        digest.update(json.dumps(config, sort_keys=True).encode())
+        digest.update(input_data.encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> str:
+        """
+        Looks up a proven optimal answer and marks it as recently used.
+
+        Args:
+            key (str): entry key.
+
+        Returns:
+            output_data (str): cached output, None when no optimal answer is cached.
+        """
+        if self.directory is None:
+            return None
+        path = self._path(key, OPTIMAL_SUFFIX)
+        try:
+            with open(path, "r") as entry_file:
+                output_data = entry_file.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return output_data
+
+    def put(self, key: str, output_data: str) -> str:
+        """
+        Stores output_data unless the cached answer is at least as good.
+
+        Args:
+            key (str): entry key.
+            output_data (str): output of solve_it.
+
+        Returns:
+            output_data (str): the better of given and cached answer.
+        """
+        if self.directory is None:
+            return output_data
+        try:
+            return self._put(key, output_data)
+        except OSError:
+            return output_data
+
+    def _put(self, key: str, output_data: str) -> str:
+        """
+        Same as put, errors of the file system are raised.
+        """
+        value, optimal = ResultCache._status(output_data)
+        with self._lock():
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+
+            incumbent_path = self._path(key, INCUMBENT_SUFFIX)
+            try:
+                with open(incumbent_path, "r") as entry_file:
+                    incumbent = entry_file.read()
+            except FileNotFoundError:
+                incumbent = None
+            if (
+                incumbent is not None
+                and not optimal
+                and ResultCache._status(incumbent)[0] >= value
+            ):
+                os.utime(incumbent_path)
+                return incumbent
+
+            self._write(
+                self._path(key, OPTIMAL_SUFFIX if optimal else INCUMBENT_SUFFIX),
+                output_data,
+            )
+            if optimal and incumbent is not None:
+                os.remove(incumbent_path)
+            self._evict()
+        return output_data
+
+    @staticmethod
+    def _status(output_data: str) -> Tuple[int, bool]:
+        """
+        Reads objective value and optimal flag from the first line of output_data.
+        """
+        value, optimal = output_data.split("\n", 1)[0].split()
+        return int(value), optimal == "1"
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, key + suffix)
+
+    def _write(self, path: str, output_data: str) -> None:
+        """
+        Writes entry to a temporary file of the cache directory and renames it into place, so
+        readers see either the old or the new entry.
+        """
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "w") as entry_file:
+                entry_file.write(output_data)
+            os.chmod(temporary_path, 0o666 & ~_UMASK)
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+    def _evict(self) -> None:
+        """
+        Removes least recently used entries, non-optimal first, until total size fits max_bytes.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith((OPTIMAL_SUFFIX, INCUMBENT_SUFFIX)):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            entries.append(
+                (name.endswith(OPTIMAL_SUFFIX), stat.st_mtime, stat.st_size, name)
+            )
+
+        total = sum(entry[2] for entry in entries)
+        for _, _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+
+    @contextmanager
+    def _lock(self):
+        """
+        Holds an exclusive lock of the cache directory shared by every process.
+        """
+        with open(os.path.join(self.directory, ".lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
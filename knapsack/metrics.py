@@ -0,0 +1,105 @@
+import math
+import os
+from contextlib import nullcontext
+
+# metrics stay disabled, and prometheus_client is never imported, unless one of these is set
+METRICS_PORT_ENV = "KNAPSACK_METRICS_PORT"
+METRICS_TEXTFILE_ENV = "KNAPSACK_METRICS_TEXTFILE"
+
+_DISABLED = nullcontext()
+_registry = None
+_phase_seconds = None
+_solve_status = None
+_textfile = None
+
+
+def enable(port: int = None, textfile: str = None) -> None:
+    """
+    Creates the metrics and starts exporting them.
+
+    Args:
+        port (int): port of a local HTTP exporter started in a background thread.
+        textfile (str): file rewritten in prometheus text format by dump.
+    """
+    global _registry, _phase_seconds, _solve_status, _textfile
+    from prometheus_client import CollectorRegistry, Counter, Summary, start_http_server
+
+    if _registry is None:
+        _registry = CollectorRegistry()
+        _phase_seconds = Summary(
+            "knapsack_phase_seconds",
+            "Time spent in each phase of solve_it.",
+            ["phase", "size"],
+            registry=_registry,
+        )
+        _solve_status = Counter(
+            "knapsack_solve_status",
+            "Finished solves by method and termination condition.",
+            ["method", "status", "size"],
+            registry=_registry,
+        )
+    if port is not None:
+        start_http_server(port, registry=_registry)
+    if textfile is not None:
+        _textfile = textfile
+
+
+def size_label(item_count: int) -> str:
+    """
+    Rounds item count up to a power of ten, so the size label has few values.
+    """
+    if item_count is None:
+        return "unknown"
+    return f"1e{max(0, math.ceil(math.log10(max(item_count, 1))))}"
+
+
+def phase(name: str, item_count: int):
+    """
+    Times a block of code as one phase of solve_it.
+
+    Args:
+        name (str): phase label, e.g. "parse", "construct_model" or "solve".
+        item_count (int): number of items of the instance, None when not known yet.
+
+    Returns:
+        timer (contextmanager): observes elapsed seconds on exit, a shared no-op when disabled.
+    """
+    if _phase_seconds is None:
+        return _DISABLED
+    return _phase_seconds.labels(phase=name, size=size_label(item_count)).time()
+
+
+def count_status(method: str, status: str, item_count: int) -> None:
+    """
+    Counts one finished solve.
+
+    Args:
+        method (str): optimization method.
+        status (str): termination condition of the solve.
+        item_count (int): number of items of the instance.
+    """
+    if _solve_status is not None:
+        _solve_status.labels(
+            method=method, status=status, size=size_label(item_count)
+        ).inc()
+
+
+def dump() -> None:
+    """
+    Writes every metric to the textfile given to enable, atomically.
+    """
+    if _textfile is not None:
+        from prometheus_client import write_to_textfile
+
+        write_to_textfile(_textfile, _registry)
+
+
+if os.environ.get(METRICS_PORT_ENV) or os.environ.get(METRICS_TEXTFILE_ENV):
+    enable(
+        port=(
+            int(os.environ[METRICS_PORT_ENV])
+            if os.environ.get(METRICS_PORT_ENV)
+            else None
+        ),
+        textfile=os.environ.get(METRICS_TEXTFILE_ENV) or None,
+    )
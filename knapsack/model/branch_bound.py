@@ -0,0 +1,176 @@
+import heapq
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Callable, Tuple
+
+import numpy as np
+
+from utils import ItemArray, SolverSummary
+
+# a single dive creates up to one node per item, so the deadline is also checked by created nodes
+CHECK_NODES = 2**16
+
+
+class BranchBoundOptimizer:
+    """
+    Create in-process best-first branch and bound optimizer for knapsack problem.
+    Items are sorted by value/weight density and every node is bounded by its fractional relaxation.
+    """
+
+    def __init__(
+        self,
+        items: ItemArray,
+        summary_items: dict,
+        time_limit: float = None,
+        callback: Callable[[dict, int], None] = None,
+        cancel: threading.Event = None,
+    ) -> None:
+        """
+        Args:
+            items (ItemArray): items of knapsack.
+            summary_items (dict): dictionary contains summary information of input.
+            time_limit (float): wall-clock limit in seconds.
+            callback (callable): called with solution dict and upper bound whenever the incumbent
+                improved, at most once every 1024 expanded or 65536 created nodes.
+            cancel (threading.Event): search stops with the incumbent once it is set.
+        """
+        self.items = items
+        self.summary_items = summary_items
+        self.time_limit = time_limit
+        self.callback = callback
+        self.cancel = cancel
+
+        capacity = summary_items["total_capacity"]
+        fitting = np.flatnonzero(items.weights <= capacity)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # zero weight items have infinite density and go first
+            density = items.values[fitting] / items.weights[fitting]
+        order = fitting[np.argsort(-density, kind="stable")]
+        self.order = order.tolist()
+        self.values = items.values[order].tolist()
+        self.weights = items.weights[order].tolist()
+        self.prefix_values = [0, *accumulate(self.values)]
+        self.prefix_weights = [0, *accumulate(self.weights)]
+
+    def _bound(self, level: int, value: int, room: int) -> Tuple[int, int, int]:
+        """
+        Computes fractional relaxation bound of a node in O(log n) from prefix sums.
+
+        Args:
+            level (int): number of sorted items already decided.
+            value (int): value of items taken so far.
+            room (int): remaining capacity.
+
+        Returns:
+            bound (int): upper bound on value reachable from node, rounded down.
+            stop (int): first sorted item that does not fit after taking every item from level on.
+            completion (int): value of feasible solution taking items from level to stop.
+        """
+        prefix_weights, prefix_values = self.prefix_weights, self.prefix_values
+        stop = bisect_right(prefix_weights, prefix_weights[level] + room) - 1
+        completion = value + prefix_values[stop] - prefix_values[level]
+        if stop >= len(self.values):
+            return completion, stop, completion
+        room_left = room - (prefix_weights[stop] - prefix_weights[level])
+        bound = completion + room_left * self.values[stop] // self.weights[stop]
+        return bound, stop, completion
+
+    def _selection(self, parents: array, taken: bytearray, best_node: tuple) -> dict:
+        """
+        Recovers 0/1 flag of each item of a node by walking its parents up to the root.
+        """
+        selected = [0] * self.summary_items["total_items"]
+        node, level, stop = best_node
+        for position in range(level, stop):
+            selected[self.order[position]] = 1
+        while level > 0:
+            selected[self.order[level - 1]] = taken[node]
+            node = parents[node]
+            level -= 1
+        return dict(enumerate(selected))
+
+    def _solve(self) -> Tuple[SolverSummary, dict]:
+        """
+        Activate optimization process. Nodes are expanded best bound first, each popped node is
+        followed down its take branch while skip branches are pushed on the heap.
+
+        Returns:
+            solver_result (SolverSummary): summary of solver status.
+            optimized_solution (dict): dictionary contain solved variable x
+        """
+        deadline = (
+            None if self.time_limit is None else time.monotonic() + self.time_limit
+        )
+        item_count = len(self.values)
+        values, weights = self.values, self.weights
+
+        # node records: parent node and whether the item of its level is taken
+        parents = array("q", [-1])
+        taken = bytearray(1)
+
+        root_bound, stop, completion = self._bound(
+            0, 0, self.summary_items["total_capacity"]
+        )
+        best_value, best_node = completion, (0, 0, stop)
+        heap = [(-root_bound, 0, 0, self.summary_items["total_capacity"], 0)]
+        termination_condition = "optimal"
+        popped = 0
+        next_check = CHECK_NODES
+        reported = -1
+
+        while heap:
+            popped += 1
+            if popped % 1024 == 0 or len(parents) >= next_check:
+                next_check = len(parents) + CHECK_NODES
+                if deadline is not None and time.monotonic() > deadline:
+                    termination_condition = "maxTimeLimit"
+                    break
+                if self.cancel is not None and self.cancel.is_set():
+                    termination_condition = "userInterrupt"
+                    break
+                if self.callback is not None and best_value > reported:
+                    reported = best_value
+                    # heap top has the largest bound of every open node
+                    bound = max(best_value, -heap[0][0])
+                    self.callback(self._selection(parents, taken, best_node), bound)
+
+            negative_bound, level, value, room, node = heapq.heappop(heap)
+            if -negative_bound <= best_value:
+                # best-first: no node left can beat incumbent
+                break
+
+            while level < item_count:
+                weight = weights[level]
+                if weight <= room:
+                    skip_bound, _, _ = self._bound(level + 1, value, room)
+                    if skip_bound > best_value:
+                        parents.append(node)
+                        taken.append(0)
+                        heapq.heappush(
+                            heap,
+                            (-skip_bound, level + 1, value, room, len(parents) - 1),
+                        )
+                    value += values[level]
+                    room -= weight
+                    flag = 1
+                else:
+                    flag = 0
+                parents.append(node)
+                taken.append(flag)
+                node = len(parents) - 1
+                level += 1
+
+                bound, stop, completion = self._bound(level, value, room)
+                if completion > best_value:
+                    best_value, best_node = completion, (node, level, stop)
+                if bound <= best_value:
+                    break
+
+        solver_result = SolverSummary(
+            solver="bb", termination_condition=termination_condition
+        )
+        optimized_solution = self._selection(parents, taken, best_node)
+        return solver_result, optimized_solution
@@ -0,0 +1,172 @@
+import time
+from typing import Tuple
+
+import numpy as np
+
+from utils import ItemArray, SolverSummary
+from model.branch_bound import BranchBoundOptimizer
+from model.dynamic import DynamicOptimizer
+
+# core problems with a larger dynamic programming sweep (items x capacity) are solved by branch
+# and bound, which honours the time limit while dynamic programming never checks it
+CORE_DP_CELLS = 10**7
+
+
+class CoreOptimizer:
+    """
+    Create core problem optimizer for large knapsack problem. The break item of the LP relaxation is
+    found by linear-time partial sorting on density, items far from the break density are fixed to
+    their LP value and only a small core around the break item is solved exactly. The core is
+    expanded while the Dembo-Hammer bound of some fixed item still beats the current solution.
+    """
+
+    def __init__(
+        self,
+        items: ItemArray,
+        summary_items: dict,
+        core_size: int = 50,
+        time_limit: float = None,
+    ) -> None:
+        self.items = items
+        self.summary_items = summary_items
+        self.core_size = core_size
+        self.time_limit = time_limit
+
+    @staticmethod
+    def _break_solution(
+        values: np.ndarray, weights: np.ndarray, capacity: int
+    ) -> Tuple[np.ndarray, int, float]:
+        """
+        Finds LP relaxation solution by repeated median partitioning on density instead of a full
+        sort, which is O(n) on average.
+
+        Args:
+            values (np.ndarray): value of each item.
+            weights (np.ndarray): weight of each item.
+            capacity (int): capacity of knapsack.
+
+        Returns:
+            in_lp (np.ndarray): flags of items taken whole in LP solution.
+            break_item (int): index of the item taken fractionally, -1 when every item fits.
+            room (float): capacity left for the break item.
+        """
+        with np.errstate(divide="ignore"):
+            density = np.where(weights > 0, values / np.maximum(weights, 1), np.inf)
+        in_lp = np.zeros(len(values), dtype=bool)
+        candidates = np.arange(len(values))
+        room = capacity
+
+        while len(candidates) > 32:
+            candidate_density = density[candidates]
+            median = np.partition(candidate_density, len(candidates) // 2)[
+                len(candidates) // 2
+            ]
+            high = candidates[candidate_density > median]
+            high_weight = int(weights[high].sum())
+            if high_weight > room:
+                candidates = high
+                continue
+
+            in_lp[high] = True
+            room -= high_weight
+            equal = candidates[candidate_density == median]
+            taken = int(np.searchsorted(np.cumsum(weights[equal]), room, side="right"))
+            in_lp[equal[:taken]] = True
+            room -= int(weights[equal[:taken]].sum())
+            if taken < len(equal):
+                return in_lp, int(equal[taken]), room
+            candidates = candidates[candidate_density < median]
+
+        candidates = candidates[np.argsort(-density[candidates], kind="stable")]
+        for i in candidates.tolist():
+            if weights[i] > room:
+                return in_lp, i, room
+            in_lp[i] = True
+            room -= int(weights[i])
+        return in_lp, -1, room
+
+    def _solve_core(
+        self, core: np.ndarray, capacity: int, time_limit: float = None
+    ) -> Tuple[str, np.ndarray]:
+        """
+        Solves core problem exactly, with dynamic programming when its sweep is small enough.
+
+        Args:
+            core (np.ndarray): indices of core items.
+            capacity (int): capacity left for core items.
+            time_limit (float): wall-clock limit in seconds of branch and bound.
+
+        Returns:
+            termination_condition (str): status of the core solve.
+            selected (np.ndarray): indices of selected core items.
+        """
+        items = ItemArray(self.items.values[core], self.items.weights[core])
+        summary_items = {"total_items": len(core), "total_capacity": capacity}
+        if len(core) * (capacity + 1) <= CORE_DP_CELLS:
+            optimizer = DynamicOptimizer(items, summary_items)
+        else:
+            optimizer = BranchBoundOptimizer(items, summary_items, time_limit)
+        solver_result, optimized_solution = optimizer._solve()
+
+        flags = np.array(list(optimized_solution.values()), dtype=bool)
+        return solver_result.termination_condition, core[flags]
+
+    def _solve(self) -> Tuple[SolverSummary, dict]:
+        """
+        Activate optimization process.
+
+        Returns:
+            solver_result (SolverSummary): summary of solver status.
+            optimized_solution (dict): dictionary contain solved variable x
+        """
+        # one deadline for the whole solve, every core solve gets what is left of it
+        deadline = (
+            None if self.time_limit is None else time.monotonic() + self.time_limit
+        )
+        values, weights = self.items.values, self.items.weights
+        capacity = self.summary_items["total_capacity"]
+        in_lp, break_item, room = CoreOptimizer._break_solution(
+            values, weights, capacity
+        )
+        if break_item < 0:
+            solver_result = SolverSummary(
+                solver="core", termination_condition="optimal"
+            )
+            return solver_result, dict(enumerate(in_lp.astype(int).tolist()))
+
+        # Dembo-Hammer: flipping item j costs at least |v_j - r * w_j| against the LP bound
+        ratio = values[break_item] / weights[break_item]
+        lp_bound = float(values[in_lp].sum()) + room * ratio
+        gap = np.abs(values - ratio * weights)
+
+        core_size = min(self.core_size, len(values))
+        core = np.argpartition(gap, core_size - 1)[:core_size]
+        while True:
+            outside = np.ones(len(values), dtype=bool)
+            outside[core] = False
+            fixed = outside & in_lp
+            termination_condition, selected_core = self._solve_core(
+                core,
+                capacity - int(weights[fixed].sum()),
+                None if deadline is None else max(0.0, deadline - time.monotonic()),
+            )
+            value = int(values[fixed].sum()) + int(values[selected_core].sum())
+
+            # an outside item can only help when its flipped bound reaches value + 1
+            unfixable = outside & (lp_bound - gap >= value + 1 - 1e-9)
+            if not unfixable.any():
+                break
+            # no expansion starts past the deadline, the core answer is kept as incumbent
+            if termination_condition != "optimal" or (
+                deadline is not None and time.monotonic() >= deadline
+            ):
+                termination_condition = "maxTimeLimit"
+                break
+            core = np.concatenate([core, np.flatnonzero(unfixable)])
+
+        selected = fixed.astype(int)
+        selected[selected_core] = 1
+        solver_result = SolverSummary(
+            solver="core", termination_condition=termination_condition
+        )
+        return solver_result, dict(enumerate(selected.tolist()))
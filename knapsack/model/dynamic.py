@@ -0,0 +1,243 @@
+from typing import Tuple
+
+import numpy as np
+
+from utils import ItemArray, SolverSummary
+
+
+class DynamicOptimizer:
+    """
+    Create in-process dynamic programming optimizer that yeild optimal solution for knapsack problem
+    """
+
+    def __init__(
+        self,
+        items: ItemArray,
+        summary_items: dict,
+        traceback: str = "auto",
+        table_limit: int = 2**28,
+    ) -> None:
+        """
+        Args:
+            items (ItemArray): columnar container of items.
+            summary_items (dict): dictionary contains summary information of input.
+            traceback (str): "table" keeps the full bit-packed take/skip table, "divide" keeps only
+                capacity-length rows and recovers items by divide and conquer, "auto" picks "table"
+                whenever the table fits in table_limit.
+            table_limit (int): maximum size in bytes of a bit-packed take/skip table.
+        """
+        self.items = items
+        self.summary_items = summary_items
+        self.traceback = traceback
+        self.table_limit = table_limit
+        self.values = items.values
+        self.weights = items.weights
+
+    @staticmethod
+    def _forward(
+        values: np.ndarray, weights: np.ndarray, capacity: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sweeps items one by one over the capacity array, each item is a single vectorized np.maximum.
+        The take/skip decision of every item is kept bit-packed for backtracking.
+
+        Args:
+            values (np.ndarray): value of each item.
+            weights (np.ndarray): weight of each item.
+            capacity (int): capacity of knapsack.
+
+        Returns:
+            best (np.ndarray): best value reachable for every capacity from 0 to capacity.
+            take (np.ndarray): bit-packed table, row i flags capacities where item i is taken.
+        """
+        best = np.zeros(capacity + 1, dtype=np.int64)
+        take = np.zeros((len(values), (capacity + 8) // 8), dtype=np.uint8)
+        row = np.zeros(capacity + 1, dtype=bool)
+
+        for i in range(len(values)):
+            value, weight = int(values[i]), int(weights[i])
+            if weight > capacity or value <= 0:
+                continue
+
+            # candidate computed on a copy so the sweep reads the previous row only
+            candidate = best[: capacity + 1 - weight] + value
+            row[:weight] = False
+            np.greater(candidate, best[weight:], out=row[weight:])
+            np.maximum(best[weight:], candidate, out=best[weight:])
+            take[i] = np.packbits(row)
+
+        return best, take
+
+    @staticmethod
+    def _best_values(
+        values: np.ndarray, weights: np.ndarray, capacity: int
+    ) -> np.ndarray:
+        """
+        Same sweep as _forward but without take/skip table, memory is a fixed number of capacity-length arrays.
+
+        Args:
+            values (np.ndarray): value of each item.
+            weights (np.ndarray): weight of each item.
+            capacity (int): capacity of knapsack.
+
+        Returns:
+            best (np.ndarray): best value reachable for every capacity from 0 to capacity.
+        """
+        best = np.zeros(capacity + 1, dtype=np.int64)
+        for i in range(len(values)):
+            value, weight = int(values[i]), int(weights[i])
+            if weight > capacity or value <= 0:
+                continue
+            candidate = best[: capacity + 1 - weight] + value
+            np.maximum(best[weight:], candidate, out=best[weight:])
+        return best
+
+    @staticmethod
+    def _table_bytes(item_count: int, capacity: int) -> int:
+        """
+        Size in bytes of bit-packed take/skip table for given problem size.
+        """
+        return item_count * ((capacity + 8) // 8)
+
+    @staticmethod
+    def _divide(values: np.ndarray, weights: np.ndarray, capacity: int) -> list:
+        """
+        Hirschberg-style divide and conquer traceback. Items are split in halves, best values of both
+        halves are computed for every capacity and the capacity split that reaches the optimum is
+        searched. Both halves are then solved again on their share of capacity until the take/skip
+        table of a part is no bigger than one int64 row of full capacity.
+
+        Args:
+            values (np.ndarray): value of each item.
+            weights (np.ndarray): weight of each item.
+            capacity (int): capacity of knapsack.
+
+        Returns:
+            selected (list): 0/1 flag of each item.
+        """
+        selected = [0] * len(values)
+        leaf_bytes = 8 * (capacity + 1)
+        stack = [(0, len(values), capacity)]
+        while stack:
+            low, high, part_capacity = stack.pop()
+            if DynamicOptimizer._table_bytes(high - low, part_capacity) <= leaf_bytes:
+                _, take = DynamicOptimizer._forward(
+                    values[low:high], weights[low:high], part_capacity
+                )
+                selected[low:high] = DynamicOptimizer._backtrack(
+                    take, weights[low:high], part_capacity
+                )
+                continue
+
+            middle = (low + high) // 2
+            head = DynamicOptimizer._best_values(
+                values[low:middle], weights[low:middle], part_capacity
+            )
+            tail = DynamicOptimizer._best_values(
+                values[middle:high], weights[middle:high], part_capacity
+            )
+            # head[c] + tail[part_capacity - c] is the best value when head gets capacity c
+            head += tail[::-1]
+            del tail
+            split = int(np.argmax(head))
+            del head
+
+            stack.append((low, middle, split))
+            stack.append((middle, high, part_capacity - split))
+        return selected
+
+    @staticmethod
+    def _backtrack(take: np.ndarray, weights: np.ndarray, capacity: int) -> list:
+        """
+        Recovers selected items from the bit-packed take/skip table.
+
+        Args:
+            take (np.ndarray): bit-packed table produced by _forward.
+            weights (np.ndarray): weight of each item.
+            capacity (int): capacity of knapsack.
+
+        Returns:
+            selected (list): 0/1 flag of each item.
+        """
+        selected = [0] * len(weights)
+        remaining = capacity
+        for i in range(len(weights) - 1, -1, -1):
+            if (take[i, remaining >> 3] >> (7 - (remaining & 7))) & 1:
+                selected[i] = 1
+                remaining -= int(weights[i])
+        return selected
+
+    def _solve_capacities(
+        self, capacities: list, selected_capacities: list = ()
+    ) -> Tuple[dict, dict]:
+        """
+        Answers many capacities with one sweep over the largest of them, since the best value
+        array of the sweep holds the optimum of every smaller capacity. Selections are backtracked
+        from the same take/skip table when it fits table_limit, otherwise each one is recovered by
+        divide and conquer on its own capacity.
+
+        Args:
+            capacities (list): capacities whose optimal value is wanted.
+            selected_capacities (list): capacities whose selection is wanted as well.
+
+        Returns:
+            best_values (dict): optimal value of each capacity.
+            selections (dict): 0/1 flag of each item for each capacity of selected_capacities.
+        """
+        capacities = [int(capacity) for capacity in capacities]
+        selected_capacities = [int(capacity) for capacity in selected_capacities]
+        wanted = capacities + selected_capacities
+        if min(wanted, default=0) < 0:
+            raise ValueError("capacities must be non-negative")
+        capacity = max(wanted, default=0)
+
+        traceback = self.traceback
+        if traceback == "auto":
+            table_bytes = DynamicOptimizer._table_bytes(len(self.values), capacity)
+            traceback = "table" if table_bytes <= self.table_limit else "divide"
+        if traceback not in ("table", "divide"):
+            raise ValueError(f"unknown traceback {traceback!r}")
+
+        selections = {}
+        if selected_capacities and traceback == "table":
+            best, take = DynamicOptimizer._forward(self.values, self.weights, capacity)
+            for selected_capacity in selected_capacities:
+                selections[selected_capacity] = DynamicOptimizer._backtrack(
+                    take, self.weights, selected_capacity
+                )
+            del take
+        else:
+            best = DynamicOptimizer._best_values(self.values, self.weights, capacity)
+            for selected_capacity in selected_capacities:
+                selections[selected_capacity] = DynamicOptimizer._divide(
+                    self.values, self.weights, selected_capacity
+                )
+
+        best_values = {capacity: int(best[capacity]) for capacity in wanted}
+        return best_values, selections
+
+    def _solve(self) -> Tuple[SolverSummary, dict]:
+        """
+        Activate optimization process.
+
+        Returns:
+            solver_result (SolverSummary): summary of solver status.
+            optimized_solution (dict): dictionary contain solved variable x
+        """
+        capacity = self.summary_items["total_capacity"]
+        traceback = self.traceback
+        if traceback == "auto":
+            table_bytes = DynamicOptimizer._table_bytes(len(self.values), capacity)
+            traceback = "table" if table_bytes <= self.table_limit else "divide"
+
+        if traceback == "table":
+            _, take = DynamicOptimizer._forward(self.values, self.weights, capacity)
+            selected = DynamicOptimizer._backtrack(take, self.weights, capacity)
+        elif traceback == "divide":
+            selected = DynamicOptimizer._divide(self.values, self.weights, capacity)
+        else:
+            raise ValueError(f"unknown traceback {traceback!r}")
+
+        solver_result = SolverSummary(solver="dp", termination_condition="optimal")
+        optimized_solution = dict(enumerate(selected))
+        return solver_result, optimized_solution
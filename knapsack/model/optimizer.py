@@ -1,21 +1,32 @@
 from collections import namedtuple
 from typing import Dict, Tuple
-from prometheus_client import Summary
+import numpy as np
 import pyomo.environ as pyo
 
-from pyomo.core.expr.numeric_expr import SumExpression
+from pyomo.core.expr.numeric_expr import LinearExpression, SumExpression
 from pyomo.opt.results.results_ import SolverResults
+from pyomo.solvers.plugins.solvers.persistent_solver import PersistentSolver
 
+from common.pyomo_optimizer import PyomoOptimizer
+import metrics
 
-class LinearOptimizer:
+
+class LinearOptimizer(PyomoOptimizer):
     """
     Create optimizer that yeild optimal solution for knapsack problem
     """
 
-    def __init__(self, items: namedtuple, summary_items: dict) -> None:
+    sense = pyo.maximize
+
+    def __init__(
+        self, items: namedtuple, summary_items: dict, fast_build: bool = False
+    ) -> None:
         self.items = items
         self.summary_items = summary_items
-        self.model = self.construct_model()
+        with metrics.phase("construct_model", summary_items["total_items"]):
+            self.model = (
+                self.construct_model_fast() if fast_build else self.construct_model()
+            )
 
     def construct_model(self) -> pyo.ConcreteModel:
         """
@@ -41,17 +52,38 @@ class LinearOptimizer:
         model.con.add(expr=used_capacity <= self.summary_items["total_capacity"])
         return model
 
-    @staticmethod
-    def init_concrete_model() -> pyo.ConcreteModel:
+    def session(self, solver: str = "glpk") -> "SolverSession":
         """
-        Initiates concrete model object.
+        Opens solver session for repeated solves of the same items.
+
+        Args:
+            solver (str): name of solver that will be used in optimization process.
 
         Returns:
-            model (pyo.ConcreteModel): an empty concrete model object.
+            session (SolverSession): session keeping model and solver alive between solves.
         """
-        model = pyo.ConcreteModel()
-        model.con = pyo.ConstraintList()
-        model.obj = pyo.Objective(expr=0, sense=pyo.maximize)
+        return SolverSession(self.items, self.summary_items, solver)
+
+    def construct_model_fast(self) -> pyo.ConcreteModel:
+        """
+        Constructs the same model as construct_model, but objective and capacity constraint are
+        built as LinearExpression directly from value and weight arrays instead of summing one
+        pyomo expression per item, and no unused integer variables are declared.
+
+        Returns:
+            model (pyo.ConcreteModel): concrete model object contain variables, objective and constrain.
+        """
+        model = LinearOptimizer.init_concrete_model()
+        model.x = pyo.Var(range(self.summary_items["total_items"]), within=pyo.Binary)
+        variables = list(model.x.values())
+
+        model.obj.expr = LinearExpression(
+            constant=0, linear_coefs=self.items.values.tolist(), linear_vars=variables
+        )
+        used_capacity = LinearExpression(
+            constant=0, linear_coefs=self.items.weights.tolist(), linear_vars=variables
+        )
+        model.con.add(expr=used_capacity <= self.summary_items["total_capacity"])
         return model
 
     @staticmethod
@@ -74,9 +106,33 @@ class LinearOptimizer:
         )
         return model
 
+    def greedy_incumbent(self) -> dict:
+        """
+        Builds feasible solution by taking items in decreasing value/weight density while they fit.
+
+        Returns:
+            incumbent (dict): dictionary of 0/1 value of variable x for each item.
+        """
+        values, weights = self.items.values, self.items.weights
+        with np.errstate(divide="ignore", invalid="ignore"):
+            order = np.argsort(-(values / weights), kind="stable")
+
+        incumbent = dict.fromkeys(range(len(values)), 0)
+        room = self.summary_items["total_capacity"]
+        for i, weight in zip(order.tolist(), weights[order].tolist()):
+            if weight <= room:
+                incumbent[i] = 1
+                room -= weight
+        return incumbent
+
     @staticmethod
     def _solve(
-        model: pyo.ConcreteModel, solver: str = "glpk"
+        model: pyo.ConcreteModel,
+        solver: str = "glpk",
+        time_limit: float = None,
+        mip_gap: float = None,
+        incumbent: dict = None,
+        tee: bool = False,
     ) -> Tuple[SolverResults, dict]:
         """
         Activate optimization process.
@@ -84,12 +140,117 @@ class LinearOptimizer:
         Args:
             model (pyo.ConcreteModel): concrete model object contain variables, objective and constrain.
             solver (str): name of solver that will be used in optimization process.
+            time_limit (float): wall-clock limit in seconds given to solver.
+            mip_gap (float): relative gap at which solver may stop, result is then not flagged optimal.
+            incumbent (dict): feasible solution used as warm start, for solvers without warm start
+                (glpk) its value is added as objective cutoff, and it is returned when solver does not
+                find anything better within time_limit.
+            tee (bool): stream solver log to stdout.
+
+        Returns:
+            solver_result (SolverResults): pyomo object contains summary of solver log
+            optimized_solution (dict): dictionary contain solved variable x
+        """
+        with metrics.phase("solve", len(model.x)):
+            solver_result = PyomoOptimizer.run_solver(
+                model,
+                solver,
+                time_limit=time_limit,
+                mip_gap=mip_gap,
+                incumbent=None if incumbent is None else {"x": incumbent},
+                tee=tee,
+            )
+            # solve_it times extraction of the selection for every engine alike
+            optimized_solution = model.x.get_values()
+        return solver_result, optimized_solution
+
+
+class SolverSession:
+    """
+    Keeps model and solver instance alive between solves of the same items.
+    Values, weights and capacity are mutable parameters, so a new solve only changes parameters
+    instead of rebuilding the model. Persistent solvers (e.g. "gurobi_persistent") also keep the
+    model loaded and only receive the changed objective or constraint.
+    """
+
+    def __init__(
+        self, items: namedtuple, summary_items: dict, solver: str = "glpk"
+    ) -> None:
+        self.summary_items = dict(summary_items)
+        self.model = SolverSession.construct_model(items, summary_items)
+        self.opt = pyo.SolverFactory(solver)
+        self.persistent = isinstance(self.opt, PersistentSolver)
+        if self.persistent:
+            self.opt.set_instance(self.model)
+
+    @staticmethod
+    def construct_model(items: namedtuple, summary_items: dict) -> pyo.ConcreteModel:
+        """
+        Constructs knapsack model whose coefficients and right-hand side are mutable parameters.
+
+        Args:
+            items (namedtuple): named tuple contain information of each item.
+            summary_items (dict): dictionary contains summary information of input.
+
+        Returns:
+            model (pyo.ConcreteModel): concrete model object contain variables, objective and constrain.
+        """
+        index = range(summary_items["total_items"])
+        model = pyo.ConcreteModel()
+        model.x = pyo.Var(index, within=pyo.Binary)
+        model.value = pyo.Param(
+            index, mutable=True, initialize=dict(enumerate(items.values.tolist()))
+        )
+        model.weight = pyo.Param(
+            index, mutable=True, initialize=dict(enumerate(items.weights.tolist()))
+        )
+        model.capacity = pyo.Param(
+            mutable=True, initialize=summary_items["total_capacity"]
+        )
+        model.obj = pyo.Objective(
+            expr=pyo.quicksum(model.value[i] * model.x[i] for i in index),
+            sense=pyo.maximize,
+        )
+        model.con = pyo.Constraint(
+            expr=pyo.quicksum(model.weight[i] * model.x[i] for i in index)
+            <= model.capacity
+        )
+        return model
+
+    def solve(
+        self,
+        capacity: int = None,
+        values: Dict[int, int] = None,
+        weights: Dict[int, int] = None,
+    ) -> Tuple[SolverResults, dict]:
+        """
+        Solves model again after changing only the given coefficients.
+
+        Args:
+            capacity (int): new capacity of knapsack, None keeps current one.
+            values (dict): new value of changed items by item index.
+            weights (dict): new weight of changed items by item index.
 
         Returns:
             solver_result (SolverResults): pyomo object contains summary of solver log
             optimized_solution (dict): dictionary contain solved variable x
         """
-        opt = pyo.SolverFactory(solver)
-        solver_result = opt.solve(model, tee=True)
-        optimized_solution = model.x.get_values()
+        if capacity is not None:
+            self.model.capacity.set_value(capacity)
+            self.summary_items["total_capacity"] = capacity
+        if values:
+            self.model.value.store_values(values)
+        if weights:
+            self.model.weight.store_values(weights)
+
+        if self.persistent:
+            if values:
+                self.opt.set_objective(self.model.obj)
+            if capacity is not None or weights:
+                self.opt.remove_constraint(self.model.con)
+                self.opt.add_constraint(self.model.con)
+            solver_result = self.opt.solve(tee=False)
+        else:
+            solver_result = self.opt.solve(self.model, tee=False)
+        optimized_solution = self.model.x.get_values()
         return solver_result, optimized_solution
@@ -0,0 +1,188 @@
+from math import gcd
+from typing import List, Tuple
+
+import numpy as np
+
+from utils import ItemArray
+
+
+class Reduction:
+    """
+    Reduces knapsack problem before any optimizer sees it and maps answer of reduced problem back to
+    original item indices.
+
+    Reduction steps:
+        1. items heavier than capacity or without value are fixed to 0.
+        2. items are fixed to their LP relaxation value when the LP bound with the item flipped
+           is no better than a greedy lower bound (Martello-Toth style fixing).
+        3. identical items are merged and split again in binary multiples (1, 2, 4, ...).
+        4. weights and capacity are divided by the greatest common divisor of the weights.
+    Solutions that flip a fixed item are never better than the greedy solution, so restore keeps the
+    greedy solution whenever the reduced problem does not beat it.
+    """
+
+    def __init__(self, items: ItemArray, summary_items: dict) -> None:
+        self.original_items = items
+        self.original_summary_items = summary_items
+
+        # -1 for free items, otherwise fixed 0/1 value
+        self.fixed = np.full(len(items), -1, dtype=np.int8)
+        self.incumbent, self.incumbent_value = self._greedy()
+        self._fix_trivial()
+        self._fix_by_bound()
+        self.items, self.summary_items, self.members = self._merge()
+
+    def _greedy(self) -> Tuple[np.ndarray, int]:
+        """
+        Builds feasible solution by taking items in decreasing density while they fit.
+
+        Returns:
+            selected (np.ndarray): 0/1 flag of each original item.
+            value (int): total value of selected items.
+        """
+        values, weights = self.original_items.values, self.original_items.weights
+        order = Reduction._density_order(values, weights)
+
+        selected = np.zeros(len(values), dtype=np.int8)
+        room = self.original_summary_items["total_capacity"]
+        for i, weight in zip(order.tolist(), weights[order].tolist()):
+            if weight <= room and values[i] > 0:
+                selected[i] = 1
+                room -= weight
+        return selected, int(values @ selected)
+
+    @staticmethod
+    def _density_order(values: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """
+        Sorts item indices by decreasing value/weight density, zero weight items first.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            density = values / weights
+        density[np.isnan(density)] = 0
+        return np.argsort(-density, kind="stable")
+
+    def _fix_trivial(self) -> None:
+        """
+        Fixes items that can never be taken to 0 and free items of zero weight to 1.
+        """
+        values, weights = self.original_items.values, self.original_items.weights
+        capacity = self.original_summary_items["total_capacity"]
+        self.fixed[(weights > capacity) | (values <= 0)] = 0
+        self.fixed[(weights == 0) & (values > 0)] = 1
+
+    def _fix_by_bound(self) -> None:
+        """
+        Fixes free items to their LP relaxation value when the LP bound with the item flipped,
+        computed from prefix sums in O(log n) per item, is no better than greedy lower bound.
+        """
+        free = np.flatnonzero(self.fixed == -1)
+        if len(free) == 0:
+            return
+        values, weights = self.original_items.values, self.original_items.weights
+        capacity = self.original_summary_items["total_capacity"] - int(
+            weights[self.fixed == 1].sum()
+        )
+
+        order = free[Reduction._density_order(values[free], weights[free])]
+        # sentinel item after the last one keeps the fractional part zero when every item fits
+        sorted_values = np.append(values[order], 0)
+        sorted_weights = np.append(weights[order], 1)
+        prefix_values = np.concatenate(([0], np.cumsum(sorted_values[:-1])))
+        prefix_weights = np.concatenate(([0], np.cumsum(sorted_weights[:-1])))
+
+        positions = np.arange(len(order))
+        break_position = np.searchsorted(prefix_weights, capacity, side="right") - 1
+        in_lp = positions < break_position
+        item_values, item_weights = sorted_values[:-1], sorted_weights[:-1]
+
+        # items in LP solution are removed: the fill continues past the break item
+        # items out of LP solution are forced in: the fill stops before the break item
+        room = np.where(in_lp, capacity + item_weights, capacity - item_weights)
+        stop = np.searchsorted(prefix_weights, room, side="right") - 1
+        feasible = room >= 0
+        stop = np.clip(stop, 0, len(order))
+        left = room - prefix_weights[stop]
+        bound = (
+            prefix_values[stop]
+            + left * sorted_values[stop] // sorted_weights[stop]
+            + np.where(in_lp, -item_values, item_values)
+        )
+        # bounds cover free items only, zero weight items already fixed to 1 add to every solution
+        fixable = ~feasible | (
+            bound <= self.incumbent_value - int(values[self.fixed == 1].sum())
+        )
+        self.fixed[order[fixable]] = in_lp[fixable].astype(np.int8)
+
+        # taking the fixed items may leave no room for some free items
+        capacity = self.original_summary_items["total_capacity"] - int(
+            weights[self.fixed == 1].sum()
+        )
+        self.fixed[(self.fixed == -1) & (weights > capacity)] = 0
+
+    def _merge(self) -> Tuple[ItemArray, dict, List[np.ndarray]]:
+        """
+        Builds reduced problem from free items, merging identical items and dividing weights by
+        their greatest common divisor.
+
+        Returns:
+            items (ItemArray): items of reduced problem.
+            summary_items (dict): dictionary contains summary information of reduced problem.
+            members (list): original indices represented by each reduced item.
+        """
+        values, weights = self.original_items.values, self.original_items.weights
+        capacity = self.original_summary_items["total_capacity"] - int(
+            weights[self.fixed == 1].sum()
+        )
+        free = np.flatnonzero(self.fixed == -1)
+
+        pairs, inverse = np.unique(
+            np.stack([values[free], weights[free]], axis=1), axis=0, return_inverse=True
+        )
+        groups = np.argsort(inverse.ravel(), kind="stable")
+        counts = np.bincount(inverse.ravel(), minlength=len(pairs))
+
+        reduced_values, reduced_weights, members = [], [], []
+        start = 0
+        for (value, weight), count in zip(pairs.tolist(), counts.tolist()):
+            group = free[groups[start : start + count]]
+            start += count
+            # binary split keeps every copy count from 0 to count reachable
+            multiple, taken = 1, 0
+            while taken < count:
+                multiple = min(multiple, count - taken)
+                reduced_values.append(value * multiple)
+                reduced_weights.append(weight * multiple)
+                members.append(group[taken : taken + multiple])
+                taken += multiple
+                multiple *= 2
+
+        reduced_weights = np.array(reduced_weights, dtype=np.int64)
+        divisor = gcd(*reduced_weights.tolist()) if len(reduced_weights) else 1
+        if divisor > 1:
+            reduced_weights //= divisor
+            capacity //= divisor
+
+        items = ItemArray(np.array(reduced_values, dtype=np.int64), reduced_weights)
+        summary_items = {"total_items": len(items), "total_capacity": capacity}
+        return items, summary_items, members
+
+    def restore(self, optimized_solution: dict) -> dict:
+        """
+        Maps solution of reduced problem back to original items. Greedy solution is returned
+        instead when it is better.
+
+        Args:
+            optimized_solution (dict): dictionary of solved variable x of reduced problem.
+
+        Returns:
+            optimized_solution (dict): dictionary of 0/1 value of each original item.
+        """
+        selected = np.where(self.fixed == 1, 1, 0).astype(np.int8)
+        for j, value in optimized_solution.items():
+            # solver values may be floats close to 0 or 1
+            if value > 0.5:
+                selected[self.members[j]] = 1
+
+        if int(self.original_items.values @ selected) < self.incumbent_value:
+            selected = self.incumbent
+        return dict(enumerate(selected.tolist()))
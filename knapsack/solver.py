@@ -1,45 +1,414 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-from utils import format_input, format_output
-from model.optimizer import LinearOptimizer
+import queue
+import threading
+import time
+from typing import Callable, Iterator, Tuple
 
+import numpy as np
 
-def solve_it(input_data: str) -> str:
+import metrics
+from utils import (
+    Incumbent,
+    ItemArray,
+    SolverSummary,
+    format_input,
+    format_output,
+    get_opt_ending_status,
+)
+from reduction import Reduction
+from cache import ResultCache, cache_enabled
+from model.dynamic import DynamicOptimizer
+from model.branch_bound import BranchBoundOptimizer
+from model.core import CoreOptimizer
+
+METHODS = ("mip", "mip_fast", "dp", "bb", "core", "portfolio")
+PORTFOLIO_METHODS = ("dp", "bb", "mip")
+# capacity-length int64 rows of dynamic programming stop being cheap above this
+PORTFOLIO_DP_CAPACITY = 10**7
+
+
+def run_optimizer(
+    items: list,
+    summary_items: dict,
+    method: str = "mip",
+    time_limit: float = None,
+    mip_gap: float = None,
+    callback: Callable[[dict, float], None] = None,
+    cancel: threading.Event = None,
+) -> tuple:
+    """
+    Running selected optimization method for given items.
+
+    Args:
+        items (list): named tuple of each item.
+        summary_items (dict): dictionary contains summary information of input.
+        method (str): "mip" for pyomo model solved by glpk, "mip_fast" for the same model built from
+            coefficient arrays, "dp" for in-process dynamic programming,
+            "bb" for in-process branch and bound, "core" for exact core problem algorithm,
+            "portfolio" to race them in separate processes.
+        time_limit (float): wall-clock limit in seconds, honoured by "mip", "bb", "core" and "portfolio".
+        mip_gap (float): relative gap at which "mip" may stop without proving optimality.
+        callback (callable): called with solution dict and upper bound (None when unknown) of
+            improving solutions found before the end, by "bb" while searching and by "mip" for its
+            greedy warm start.
+        cancel (threading.Event): "bb" stops with its incumbent once it is set.
+
+    Returns:
+        solver_summary (SolverResults): object that contains log of solver status.
+        optimized_solution (dict): dictionary contain solved variable x
+    """
+    if method in ("mip", "mip_fast"):
+        # pyomo is imported only when a model is built
+        from model.optimizer import LinearOptimizer
+
+        optimizer = LinearOptimizer(
+            items, summary_items, fast_build=method == "mip_fast"
+        )
+        incumbent = optimizer.greedy_incumbent()
+        if callback is not None:
+            # glpk runs as external process and reports nothing until it exits
+            callback(incumbent, None)
+        return optimizer._solve(
+            optimizer.model,
+            time_limit=time_limit,
+            mip_gap=mip_gap,
+            incumbent=incumbent,
+        )
+    if method not in METHODS:
+        raise ValueError(f"unknown method {method!r}, expected one of {METHODS}")
+    # the mip engines time their own solve phase, after model construction
+    with metrics.phase("solve", len(items)):
+        if method == "dp":
+            return DynamicOptimizer(items, summary_items)._solve()
+        if method == "bb":
+            return BranchBoundOptimizer(
+                items, summary_items, time_limit, callback, cancel
+            )._solve()
+        if method == "core":
+            return CoreOptimizer(items, summary_items, time_limit=time_limit)._solve()
+        return run_portfolio(items, summary_items, time_limit=time_limit)
+
+
+def _portfolio_worker(
+    items: list, summary_items: dict, method: str, time_limit: float
+) -> tuple:
+    """
+    Runs one portfolio method inside a worker process and makes its result picklable.
+
+    Returns:
+        method (str): name of the method.
+        solver_summary (SolverSummary): summary of solver status.
+        selected (list): 0/1 flag of each item.
+    """
+    solver_summary, optimized_solution = run_optimizer(
+        items, summary_items, method, time_limit
+    )
+    solver_summary = SolverSummary(
+        solver=method, termination_condition=get_opt_ending_status(solver_summary)
+    )
+    selected = [int(value) for value in optimized_solution.values()]
+    return method, solver_summary, selected
+
+
+def run_portfolio(
+    items: list,
+    summary_items: dict,
+    methods: tuple = PORTFOLIO_METHODS,
+    time_limit: float = None,
+) -> tuple:
+    """
+    Races several optimization methods in a process pool. The first proven optimal answer wins and
+    the remaining workers are killed; when the deadline passes the best incumbent is returned.
+
+    Args:
+        items (list): named tuple of each item.
+        summary_items (dict): dictionary contains summary information of input.
+        methods (tuple): methods started in parallel, "dp" is left out for large capacity.
+        time_limit (float): wall-clock limit in seconds, None waits for an optimal answer.
+
+    Returns:
+        solver_summary (SolverSummary): summary of solver status of the winning method.
+        optimized_solution (dict): dictionary contain solved variable x
+    """
+    if summary_items["total_capacity"] > PORTFOLIO_DP_CAPACITY:
+        methods = tuple(method for method in methods if method != "dp")
+    deadline = None if time_limit is None else time.monotonic() + time_limit
+    # leave workers with a time limit some room to report their incumbent before the deadline
+    worker_time_limit = None if time_limit is None else 0.9 * time_limit
+
+    results = queue.Queue()
+    import multiprocessing
+
+    pool = multiprocessing.Pool(len(methods))
+    try:
+        for method in methods:
+            pool.apply_async(
+                _portfolio_worker,
+                (items, summary_items, method, worker_time_limit),
+                callback=results.put,
+                error_callback=lambda error: results.put(None),
+            )
+
+        best = None
+        for _ in methods:
+            timeout = (
+                None if deadline is None else max(0.0, deadline - time.monotonic())
+            )
+            try:
+                result = results.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if result is None:
+                continue
+
+            _, solver_summary, selected = result
+            value = sum(item.value for item, flag in zip(items, selected) if flag)
+            optimal = solver_summary.termination_condition == "optimal"
+            if best is None or value > best[0] or optimal:
+                best = (value, solver_summary, selected)
+            if optimal:
+                break
+    finally:
+        pool.terminate()
+        pool.join()
+
+    if best is None:
+        raise RuntimeError(f"no portfolio method among {methods} returned a solution")
+    _, solver_summary, selected = best
+    return solver_summary, dict(enumerate(selected))
+
+
+def _knapsack_dict(items: ItemArray, optimized_solution: dict) -> dict:
+    """
+    Builds selection vector of a solution with its value and weight.
+
+    Args:
+        items (ItemArray): items of knapsack.
+        optimized_solution (dict): 0/1 value of each item.
+
+    Returns:
+        knapsack_dict (dict): "selected_items" vector, "value" and "weight" of the selection.
+    """
+    # solver values may be floats close to 0 or 1
+    selected = (
+        np.fromiter(
+            optimized_solution.values(),
+            dtype=np.float64,
+            count=len(optimized_solution),
+        )
+        > 0.5
+    ).astype(np.int64)
+    return {
+        "selected_items": selected,
+        "value": int(items.values @ selected),
+        "weight": int(items.weights @ selected),
+    }
+
+
+def _incumbent(output_data: str, bound: float, start: float) -> Incumbent:
+    """
+    Describes output_data as an Incumbent, the bound of an optimal answer is its value.
+    """
+    objective, optimal = output_data.split("\n", 1)[0].split()
+    objective, optimal = int(objective), optimal == "1"
+    if optimal:
+        bound = objective
+    gap = None if bound is None else (bound - objective) / max(bound, 1)
+    return Incumbent(
+        objective=objective,
+        bound=bound,
+        gap=gap,
+        elapsed=time.monotonic() - start,
+        optimal=optimal,
+        output_data=output_data,
+    )
+
+
+def solve_it(
+    input_data: str,
+    method: str = "mip",
+    time_limit: float = None,
+    mip_gap: float = None,
+    reduce: bool = True,
+    use_cache: bool = None,
+    callback: Callable[[Incumbent], None] = None,
+    cancel: threading.Event = None,
+) -> str:
     """
     Solving knapsack problem for given input_data.
 
     Args:
         input_data (str): input data of items for selection in knapsack.
+        method (str): optimization method, one of METHODS.
+        time_limit (float): wall-clock limit in seconds, incumbent is returned when it is reached.
+        mip_gap (float): relative gap at which "mip" may stop, answer is then flagged non-optimal.
+        reduce (bool): solve only the core problem left after Reduction.
+        use_cache (bool): return proven optimal answer of an earlier run from ResultCache, and keep
+            the better of the new and the cached answer. None uses the cache only when
+            KNAPSACK_CACHE_DIR is set.
+        callback (callable): called with an Incumbent for every improving solution found during the
+            search and once more for the returned answer.
+        cancel (threading.Event): search of "bb" stops with its incumbent once it is set.
 
     Returns:
         output_data (str): output data of itemse selected in knapsack.
     """
+    start = time.monotonic()
+    if use_cache is None:
+        use_cache = cache_enabled()
+    if use_cache:
+        cache = ResultCache()
+        cache_key = cache.key(input_data, {"method": method, "reduce": reduce})
+        cached = cache.get(cache_key)
+        if cached is not None:
+            if callback is not None:
+                callback(_incumbent(cached, None, start))
+            return cached
+
     # Modify this code to run your optimization algorithm
-    items, summary_items = format_input(input_data)
+    # item count is only known after parsing
+    with metrics.phase("parse", None):
+        items, summary_items = format_input(input_data)
+    item_count = summary_items["total_items"]
 
-    optimizer = LinearOptimizer(items, summary_items)
-    solver_summary, optimized_solution = optimizer._solve(optimizer.model)
-
-    ls_knapsack = [int(value) for value in optimized_solution.values()]
-    ls_knapsack_value = [
-        items[i].value if ls_knapsack[i] == 1 else 0 for i in range(len(ls_knapsack))
-    ]
-    ls_knapsack_weight = [
-        items[i].weight if ls_knapsack[i] == 1 else 0 for i in range(len(ls_knapsack))
-    ]
-
-    knapsack_dict = {
-        "selected_items": ls_knapsack,
-        "value": sum(ls_knapsack_value),
-        "weight": sum(ls_knapsack_weight),
-    }
+    reduction = Reduction(items, summary_items) if reduce else None
+    # value and bound of the last reported solution
+    reported = [-1, None]
+
+    def report(optimized_solution: dict, bound: float) -> None:
+        if reduction is not None:
+            optimized_solution = reduction.restore(optimized_solution)
+            if bound is not None:
+                # bound of the reduced problem leaves out items fixed to 1
+                bound += int(items.values[reduction.fixed == 1].sum())
+        knapsack_dict = _knapsack_dict(items, optimized_solution)
+        if bound is not None:
+            reported[1] = bound
+        if knapsack_dict["value"] > reported[0]:
+            reported[0] = knapsack_dict["value"]
+            output_data = format_output(
+                knapsack_dict,
+                SolverSummary(solver=method, termination_condition="feasible"),
+            )
+            callback(_incumbent(output_data, reported[1], start))
+
+    engine_callback = None if callback is None else report
+    if reduction is not None:
+        if reduction.summary_items["total_items"] > 0:
+            solver_summary, optimized_solution = run_optimizer(
+                reduction.items,
+                reduction.summary_items,
+                method,
+                time_limit,
+                mip_gap,
+                engine_callback,
+                cancel,
+            )
+        else:
+            solver_summary = SolverSummary(
+                solver="reduction", termination_condition="optimal"
+            )
+            optimized_solution = {}
+        optimized_solution = reduction.restore(optimized_solution)
+    else:
+        solver_summary, optimized_solution = run_optimizer(
+            items,
+            summary_items,
+            method,
+            time_limit,
+            mip_gap,
+            engine_callback,
+            cancel,
+        )
+    metrics.count_status(method, get_opt_ending_status(solver_summary), item_count)
+
+    with metrics.phase("extract", item_count):
+        knapsack_dict = _knapsack_dict(items, optimized_solution)
 
     # prepare the solution in the specified output format
-    output_data = format_output(knapsack_dict, solver_summary)
+    with metrics.phase("format_output", item_count):
+        output_data = format_output(knapsack_dict, solver_summary)
+    if use_cache:
+        output_data = cache.put(cache_key, output_data)
+    metrics.dump()
+    if callback is not None:
+        callback(_incumbent(output_data, reported[1], start))
     return output_data
 
 
+def solve_capacities(
+    input_data: str, capacities: list, selected_capacities: list = ()
+) -> Tuple[dict, dict]:
+    """
+    Solving knapsack problem of the same items for many capacities with one dynamic programming
+    pass. The capacity line of input_data is ignored.
+
+    Args:
+        input_data (str): input data of items for selection in knapsack.
+        capacities (list): capacities whose optimal value is wanted.
+        selected_capacities (list): capacities whose selection is wanted as well.
+
+    Returns:
+        best_values (dict): optimal value of each capacity of capacities and selected_capacities.
+        output_data (dict): output data of items selected in knapsack, as returned by solve_it,
+            for each capacity of selected_capacities.
+    """
+    items, summary_items = format_input(input_data)
+    optimizer = DynamicOptimizer(items, summary_items)
+    best_values, selections = optimizer._solve_capacities(
+        capacities, selected_capacities
+    )
+
+    solver_summary = SolverSummary(solver="dp", termination_condition="optimal")
+    output_data = {
+        capacity: format_output(
+            _knapsack_dict(items, dict(enumerate(selected))), solver_summary
+        )
+        for capacity, selected in selections.items()
+    }
+    return best_values, output_data
+
+
+def solve_iter(input_data: str, **kwargs) -> Iterator[Incumbent]:
+    """
+    Anytime variant of solve_it. The search runs in a background thread and every improving
+    solution is yielded as an Incumbent as soon as it is found; the last one is the answer of
+    solve_it. Closing the generator, e.g. by leaving a for loop early, cancels the search of "bb"
+    at its next check, other methods finish in the background.
+
+    Args:
+        input_data (str): input data of items for selection in knapsack.
+        kwargs: keyword arguments of solve_it other than callback and cancel.
+
+    Yields:
+        incumbent (Incumbent): objective, bound, relative gap, seconds since start, optimal flag
+            and output data of the solution.
+    """
+    incumbents = queue.Queue()
+    cancel = threading.Event()
+
+    def search() -> None:
+        try:
+            solve_it(input_data, callback=incumbents.put, cancel=cancel, **kwargs)
+            incumbents.put(None)
+        except Exception as error:
+            incumbents.put(error)
+
+    threading.Thread(target=search, daemon=True).start()
+    try:
+        while True:
+            incumbent = incumbents.get()
+            if incumbent is None:
+                return
+            if isinstance(incumbent, Exception):
+                raise incumbent
+            yield incumbent
+    finally:
+        cancel.set()
+
+
 if __name__ == "__main__":
     import sys
 
@@ -47,8 +416,11 @@ if __name__ == "__main__":
         file_location = sys.argv[1].strip()
         with open(file_location, "r") as input_data_file:
             input_data = input_data_file.read()
-        print(solve_it(input_data))
+        method = sys.argv[2].strip() if len(sys.argv) > 2 else "mip"
+        time_limit = float(sys.argv[3]) if len(sys.argv) > 3 else None
+        mip_gap = float(sys.argv[4]) if len(sys.argv) > 4 else None
+        print(solve_it(input_data, method, time_limit, mip_gap))
     else:
         print(
-            "This test requires an input file.  Please select one from the data directory. (i.e. python solver.py ./data/ks_4_0)"
+            "This test requires an input file.  Please select one from the data directory. (i.e. python solver.py ./data/ks_4_0 [mip|mip_fast|dp|bb|core|portfolio] [time_limit] [mip_gap])"
         )
@@ -1,27 +1,145 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
+import atexit
 import os
+import threading
 from subprocess import Popen, PIPE
 
-def solve_it(input_data):
+# Solver.class is compiled next to this file with: javac Solver.java
+JAVA_DIR = os.path.dirname(os.path.abspath(__file__))
+# seconds a request waits for its answer before the worker is considered stuck
+REQUEST_TIMEOUT = 600
+
+
+class JavaWorker(object):
+    '''
+    Long-lived "java Solver -worker" process, so JVM startup and JIT warm-up
+    are paid once instead of on every instance.
+
+    A request is written to its stdin as "<id> <length>\\n" followed by the
+    instance data, and answered on its stdout as "<id> <ok|error> <length>\\n"
+    followed by the solution. Requests of many threads can be in flight at
+    once: a reader thread hands every answer to the request with its id. When
+    the process dies the waiting requests are retried on a new process. A
+    request left unanswered for timeout seconds fails, and the worker is
+    killed so the next request starts a fresh one.
+    '''
+
+    def __init__(self, command=None, retries=1, timeout=REQUEST_TIMEOUT):
+        '''
+        Args:
+            command: command line starting the worker
+            retries: times a request is sent again after the worker died
+            timeout: seconds to wait for an answer, None waits forever
+        '''
+        self.command = command or ['java', '-cp', JAVA_DIR, 'Solver', '-worker']
+        self.retries = retries
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.process = None
+        self.pending = {}
+        self.next_id = 0
+
+    def _start(self):
+        '''
+        Starts worker process and its reader thread, called with lock held.
+        '''
+        self.process = Popen(self.command, stdin=PIPE, stdout=PIPE)
+        self.pending = {}
+        reader = threading.Thread(target=self._read, args=(self.process, self.pending))
+        reader.daemon = True
+        reader.start()
+
+    def _read(self, process, pending):
+        '''
+        Delivers answers of process to the requests waiting in pending.
+        '''
+        while True:
+            header = process.stdout.readline()
+            if not header:
+                break
+            request_id, status, length = header.decode('ascii').split()
+            payload = process.stdout.read(int(length))
+            with self.lock:
+                request = pending.pop(request_id, None)
+            if request is None:
+                # answer of a request that timed out
+                continue
+            request['status'], request['payload'] = status, payload
+            request['done'].set()
+
+        # worker is gone, its unanswered requests are sent again by solve
+        process.wait()
+        with self.lock:
+            for request in pending.values():
+                request['done'].set()
+            pending.clear()
 
-    # Writes the inputData to a temporay file
+    def solve(self, input_data):
+        '''
+        Sends one instance to the worker and waits for its solution.
 
-    tmp_file_name = 'tmp.data'
-    tmp_file = open(tmp_file_name, 'w')
-    tmp_file.write(input_data)
-    tmp_file.close()
+        Args:
+            input_data: the instance in the format of the data directory
 
-    # Runs the command: java Solver -file=tmp.data
+        Returns:
+            the solution printed by Solver
+        '''
+        payload = input_data.encode('ascii')
+        for attempt in range(self.retries + 1):
+            request = {'done': threading.Event(), 'status': None, 'payload': None}
+            with self.lock:
+                if self.process is None or self.process.poll() is not None:
+                    self._start()
+                self.next_id += 1
+                request_id = str(self.next_id)
+                self.pending[request_id] = request
+                process, pending = self.process, self.pending
+                try:
+                    self.process.stdin.write(('%s %d\n' % (request_id, len(payload))).encode('ascii'))
+                    self.process.stdin.write(payload)
+                    self.process.stdin.flush()
+                except (IOError, OSError):
+                    # broken pipe, the reader thread fails the request when it sees the end of stdout
+                    self.process.kill()
 
-    process = Popen(['java', 'Solver', '-file=' + tmp_file_name], stdout=PIPE, universal_newlines=True)
-    (stdout, stderr) = process.communicate()
+            if not request['done'].wait(self.timeout):
+                with self.lock:
+                    expired = pending.pop(request_id, None) is not None
+                if expired:
+                    # the worker is stuck, requests of other threads are retried on a new one
+                    process.kill()
+                    raise RuntimeError('java worker gave no answer within %s seconds' % self.timeout)
+                # answered while timing out, the reader thread is setting it
+                request['done'].wait()
+            if request['status'] == 'ok':
+                return request['payload'].decode('ascii')
+            if request['status'] == 'error':
+                raise RuntimeError('java solver failed: ' + request['payload'].decode('ascii'))
 
-    # removes the temporay file
-    os.remove(tmp_file_name)
+        raise RuntimeError('java worker died %d times while solving' % (self.retries + 1))
 
-    return stdout.strip()
+    def close(self):
+        '''
+        Closes stdin of the worker, which makes it exit after answering.
+        '''
+        with self.lock:
+            process, self.process = self.process, None
+        if process is not None and process.poll() is None:
+            process.stdin.close()
+            process.wait()
+
+
+_worker = JavaWorker()
+atexit.register(_worker.close)
+
+
+def solve_it(input_data):
+
+    # Sends the inputData to the running java worker, no temporary file is written
+
+    return _worker.solve(input_data).strip()
 
 
 import sys
@@ -34,4 +152,3 @@ if __name__ == '__main__':
         print(solve_it(input_data))
     else:
         print('This test requires an input file.  Please select one from the data directory. (i.e. python solver.py ./data/ks_4_0)')
-
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# modules of the assignment import each other from the knapsack directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
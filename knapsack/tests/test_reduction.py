@@ -0,0 +1,79 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from reduction import Reduction
+from solver import run_optimizer, solve_it
+from utils import format_input
+
+
+def _brute_force(values: list, weights: list, capacity: int) -> int:
+    """
+    Best value over every subset of items.
+    """
+    best = 0
+    for flags in itertools.product((0, 1), repeat=len(values)):
+        if sum(w for w, flag in zip(weights, flags) if flag) <= capacity:
+            best = max(best, sum(v for v, flag in zip(values, flags) if flag))
+    return best
+
+
+def _instances(count: int, seed: int = 0):
+    """
+    Random small instances mixing zero weights, zero values, duplicate items and capacity 0.
+    """
+    rng = random.Random(seed)
+    for _ in range(count):
+        item_count = rng.randint(1, 8)
+        capacity = rng.choice([0, rng.randint(0, 25)])
+        values, weights = [], []
+        for _ in range(item_count):
+            if values and rng.random() < 0.2:
+                # duplicate of an earlier item
+                i = rng.randrange(len(values))
+                values.append(values[i])
+                weights.append(weights[i])
+            else:
+                values.append(rng.choice([0, rng.randint(0, 20)]))
+                weights.append(rng.choice([0, rng.randint(0, 12)]))
+        yield values, weights, capacity
+
+
+@pytest.mark.parametrize("method", ["dp", "bb", "core"])
+@pytest.mark.parametrize("reduce", [True, False])
+def test_solve_it_matches_brute_force(method: str, reduce: bool) -> None:
+    for values, weights, capacity in _instances(300):
+        input_data = f"{len(values)} {capacity}\n" + "".join(
+            f"{v} {w}\n" for v, w in zip(values, weights)
+        )
+        output_data = solve_it(input_data, method, reduce=reduce, use_cache=False)
+        objective, optimal = output_data.split("\n", 1)[0].split()
+        flags = [int(flag) for flag in output_data.split("\n", 1)[1].split()]
+
+        assert int(objective) == _brute_force(values, weights, capacity), input_data
+        assert optimal == "1"
+        assert sum(w for w, flag in zip(weights, flags) if flag) <= capacity
+        assert sum(v for v, flag in zip(values, flags) if flag) == int(objective)
+
+
+def test_zero_weight_item_does_not_fix_free_items() -> None:
+    output_data = solve_it("4 10\n1000 0\n7 6\n5 5\n5 5\n", "dp", use_cache=False)
+    assert output_data.split("\n", 1)[0] == "1010 1"
+
+
+def test_restore_rounds_solver_values() -> None:
+    # the reduced optimum beats the greedy solution, so restore does not fall back to it
+    items, summary_items = format_input("6 8\n10 9\n10 2\n18 6\n18 4\n20 9\n19 5\n")
+    reduction = Reduction(items, summary_items)
+    _, optimized_solution = run_optimizer(
+        reduction.items, reduction.summary_items, "dp"
+    )
+    # solvers report binaries as floats close to 0 or 1
+    noisy_solution = {
+        j: 0.9999999 if value else 1e-7 for j, value in optimized_solution.items()
+    }
+    assert reduction.restore(noisy_solution) == reduction.restore(optimized_solution)
+    selected = np.array(list(reduction.restore(noisy_solution).values()))
+    assert int(items.values @ selected) > reduction.incumbent_value
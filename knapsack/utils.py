@@ -1,41 +1,96 @@
+import io
 from collections import namedtuple
-from typing import Tuple
-from pyomo.opt.results.results_ import SolverResults
+from typing import TYPE_CHECKING, Iterator, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    # pyomo takes most of a second to import, it is loaded only by the "mip" engines
+    from pyomo.opt.results.results_ import SolverResults
 
 Item = namedtuple("Item", ["index", "value", "weight"])
+SolverSummary = namedtuple("SolverSummary", ["solver", "termination_condition"])
+# improving solution reported while the search runs, gap is relative to bound
+Incumbent = namedtuple(
+    "Incumbent", ["objective", "bound", "gap", "elapsed", "optimal", "output_data"]
+)
+
+
+class ItemArray:
+    """
+    Columnar container of items keeping values and weights in contiguous int64 arrays.
+    items[i] still returns an Item so items[i].value works as with a list of Item.
+    """
+
+    def __init__(self, values: np.ndarray, weights: np.ndarray) -> None:
+        self.values = np.ascontiguousarray(values, dtype=np.int64)
+        self.weights = np.ascontiguousarray(weights, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, i: int) -> Item:
+        return Item(i, int(self.values[i]), int(self.weights[i]))
+
+    def __iter__(self) -> Iterator[Item]:
+        for i, (value, weight) in enumerate(
+            zip(self.values.tolist(), self.weights.tolist())
+        ):
+            yield Item(i, value, weight)
+
+
+def _split_numbers(numbers: np.ndarray) -> Tuple[ItemArray, dict]:
+    """
+    Splits flat array of numbers of an input file into items and summary.
+
+    Args:
+        numbers (np.ndarray): every integer of input file in reading order.
+
+    Returns:
+        items (ItemArray): columnar container of items.
+        summary_items (dict): dictionary contains summary information of input.
+    """
+    item_count, capacity = int(numbers[0]), int(numbers[1])
+    summary_items = {"total_items": item_count, "total_capacity": capacity}
+
+    pairs = numbers[2 : 2 + 2 * item_count].reshape(item_count, 2)
+    items = ItemArray(pairs[:, 0], pairs[:, 1])
+    return items, summary_items
 
 
-def format_input(input_data: str) -> Tuple[namedtuple, dict]:
+def format_input(input_data: str) -> Tuple[ItemArray, dict]:
     """
     Transform input_data into desired format before putting in optimizer.
+    The whole input is converted in one bulk call instead of one Item per line.
 
     Args:
         input_data (str): string of input data extracted from the raw file.
 
     Returns:
-        items (namedtuple): named tuple contain information of each item.
+        items (ItemArray): columnar container of items, items[i] is an Item named tuple.
         summary_items (dict): dictionary contains summary information of input.
     """
+    numbers = np.fromstring(input_data, dtype=np.int64, sep=" ")
+    return _split_numbers(numbers)
 
-    lines = input_data.split("\n")
 
-    # extract information from first row
-    firstLine = lines[0].split()
-    item_count = int(firstLine[0])
-    capacity = int(firstLine[1])
-    summary_items = {"total_items": item_count, "total_capacity": capacity}
+def format_input_file(file_location: str) -> Tuple[ItemArray, dict]:
+    """
+    Same as format_input but parses file directly in numpy, so large instances are never
+    copied into a python str.
 
-    # extract information from after conclusion row
-    items = []
-    for i in range(1, item_count + 1):
-        line = lines[i]
-        parts = line.split()
-        items.append(Item(i - 1, int(parts[0]), int(parts[1])))
+    Args:
+        file_location (str): path of input file.
 
-    return items, summary_items
+    Returns:
+        items (ItemArray): columnar container of items, items[i] is an Item named tuple.
+        summary_items (dict): dictionary contains summary information of input.
+    """
+    numbers = np.fromfile(file_location, dtype=np.int64, sep=" ")
+    return _split_numbers(numbers)
 
 
-def get_opt_ending_status(solver_summary: SolverResults) -> str:
+def get_opt_ending_status(solver_summary: "SolverResults") -> str:
     """
     Extracting termination condition from SolverResults object which is log of solver status.
 
@@ -45,25 +100,46 @@ def get_opt_ending_status(solver_summary: SolverResults) -> str:
     Returns:
         termination_condition (str): status flag whether solver ends up with optimal result of not.
     """
+    if isinstance(solver_summary, SolverSummary):
+        return solver_summary.termination_condition
+
     solver_status = solver_summary.Solver._list
     termination_condition = str(solver_status[0]["termination_condition"])
     return termination_condition
 
 
-def format_output(knapsack_dict: dict, solver_summary: SolverResults) -> str:
+def write_output(knapsack_dict: dict, solver_summary: "SolverResults", stream) -> None:
     """
-    Preparing final output data.
+    Writes final output data to a binary stream in one pass. Selection flags are single digits, so
+    the line of flags is made by placing their ASCII codes between spaces of a byte array.
 
     Args:
+        knapsack_dict (dict): "value" of the selection and "selected_items", 0/1 flag of each item.
         solver_summary (SolverResults): object that contains log of solver status.
-
-    Returns:
-        termination_condition (str): status flag whether solver ends up with optimal result of not.
+        stream (BinaryIO): file object opened in binary mode, e.g. sys.stdout.buffer.
     """
     termination_condition = get_opt_ending_status(solver_summary)
 
     optimal = 1 if termination_condition == "optimal" else 0
-    output_data = str(knapsack_dict["value"]) + " " + str(optimal) + "\n"
-    output_data += " ".join(map(str, knapsack_dict["selected_items"]))
+    stream.write(f"{knapsack_dict['value']} {optimal}\n".encode())
+
+    selected = np.asarray(knapsack_dict["selected_items"], dtype=np.uint8)
+    line = np.full(max(2 * len(selected) - 1, 0), ord(" "), dtype=np.uint8)
+    line[::2] = selected + ord("0")
+    stream.write(line.data)
+
+
+def format_output(knapsack_dict: dict, solver_summary: "SolverResults") -> str:
+    """
+    Preparing final output data.
 
-    return output_data
+    Args:
+        knapsack_dict (dict): "value" of the selection and "selected_items", 0/1 flag of each item.
+        solver_summary (SolverResults): object that contains log of solver status.
+
+    Returns:
+        output_data (str): objective value and optimal flag, then flag of each item.
+    """
+    buffer = io.BytesIO()
+    write_output(knapsack_dict, solver_summary, buffer)
+    return buffer.getvalue().decode("ascii")
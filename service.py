@@ -0,0 +1,376 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import importlib
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from typing import Tuple
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+# both assignments have modules named solver, utils and model, so each kind has its own pool
+PROBLEM_DIRS = {
+    "knapsack": os.path.join(ROOT_DIR, "knapsack"),
+    "coloring": os.path.join(ROOT_DIR, "coloring"),
+}
+# imported by every worker at start, so no request pays for them
+PRELOAD_MODULES = {
+    "knapsack": ("solver", "model.optimizer"),
+    "coloring": ("solver", "model.optimizer"),
+}
+# requests taken into account by latency percentiles
+LATENCY_WINDOW = 1000
+# share of a request deadline given to solve_it as time_limit, the rest covers parsing, bounds
+# computed outside of the limited search and the round trip to the worker
+DEADLINE_SHARE = 0.6
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+
+class DeadlineExpired(Exception):
+    """
+    Raised in a worker when a request waited in the queue past its deadline.
+    """
+
+
+def _init_worker(problem: str) -> None:
+    """
+    Makes modules of problem importable in a worker process and imports them once.
+    """
+    sys.path.insert(0, PROBLEM_DIRS[problem])
+    for module in PRELOAD_MODULES[problem]:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            # optional engines (e.g. pyomo) are imported again, and fail, only when requested
+            pass
+
+
+def _solve(input_data: str, options: dict, expires_at: float) -> str:
+    """
+    Runs solve_it of the problem of the worker process.
+
+    Args:
+        input_data (str): instance in the format of the data directory.
+        options (dict): keyword arguments of solve_it.
+        expires_at (float): time.time() after which the answer is not needed anymore.
+
+    Returns:
+        output_data (str): answer of solve_it.
+    """
+    if expires_at is not None and time.time() > expires_at:
+        raise DeadlineExpired()
+    return sys.modules["solver"].solve_it(input_data, **options)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class SolverPool:
+    """
+    Warm process pool of one problem kind with a bounded queue. A request is rejected when
+    every worker is busy and max_queue requests already wait, and answered with a timeout once
+    its deadline passes; a request still queued at its deadline is dropped without solving.
+    """
+
+    def __init__(self, problem: str, workers: int, max_queue: int) -> None:
+        """
+        Args:
+            problem (str): key of PROBLEM_DIRS.
+            workers (int): worker processes.
+            max_queue (int): requests waiting for a worker before new ones are rejected.
+        """
+        self.problem = problem
+        self.workers = workers
+        self.max_queue = max_queue
+        # spawned workers do not inherit the event loop of the server
+        self.executor = concurrent.futures.ProcessPoolExecutor(
+            workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(problem,),
+        )
+        self.in_flight = 0
+        self.counts = collections.Counter()
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+
+    async def warm_up(self) -> None:
+        """
+        Starts every worker, so interpreter start and imports are paid before the first request.
+        """
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(loop.run_in_executor(self.executor, _ping) for _ in range(self.workers))
+        )
+
+    async def solve(
+        self, input_data: str, options: dict, deadline: float = None
+    ) -> Tuple[int, dict]:
+        """
+        Solves one request in the pool.
+
+        Args:
+            input_data (str): instance in the format of the data directory.
+            options (dict): keyword arguments of solve_it.
+            deadline (float): seconds the caller waits for the answer, also given to solve_it as
+                time_limit when options have none.
+
+        Returns:
+            status (int): HTTP status code.
+            body (dict): "output_data" and "latency_ms", or "error".
+        """
+        if self.in_flight >= self.workers + self.max_queue:
+            self.counts["rejected"] += 1
+            return 503, {"error": "queue full"}
+
+        start = time.monotonic()
+        expires_at = None
+        if deadline is not None:
+            expires_at = time.time() + deadline
+            options.setdefault("time_limit", DEADLINE_SHARE * deadline)
+
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        future = loop.run_in_executor(
+            self.executor, _solve, input_data, options, expires_at
+        )
+        # a worker stays busy after its caller timed out, so it is freed only when it finishes
+        future.add_done_callback(self._release)
+        try:
+            output_data = await asyncio.wait_for(asyncio.shield(future), deadline)
+        except (asyncio.TimeoutError, DeadlineExpired):
+            self.counts["expired"] += 1
+            return 504, {"error": "deadline expired"}
+        except Exception as error:
+            self.counts["failed"] += 1
+            return 500, {"error": f"{type(error).__name__}: {error}"}
+
+        latency = time.monotonic() - start
+        self.latencies.append(latency)
+        self.counts["completed"] += 1
+        return 200, {"output_data": output_data, "latency_ms": latency * 1000}
+
+    def _release(self, future: asyncio.Future) -> None:
+        self.in_flight -= 1
+        if not future.cancelled():
+            # retrieve the exception of requests nobody awaits anymore
+            future.exception()
+
+    def stats(self) -> dict:
+        """
+        Returns queue depth, request counts and latency percentiles of recent requests.
+        """
+        running = min(self.in_flight, self.workers)
+        latencies = sorted(self.latencies)
+        percentiles = {}
+        for percentile in (50, 90, 99):
+            percentiles[f"p{percentile}"] = (
+                latencies[min(len(latencies) - 1, len(latencies) * percentile // 100)]
+                * 1000
+                if latencies
+                else None
+            )
+        return {
+            "workers": self.workers,
+            "running": running,
+            "queued": self.in_flight - running,
+            "max_queue": self.max_queue,
+            **{
+                name: self.counts[name]
+                for name in ("completed", "rejected", "expired", "failed")
+            },
+            "latency_ms": percentiles,
+        }
+
+    def shutdown(self) -> None:
+        """
+        Drops queued requests and stops every worker, including those still solving.
+        """
+        # ProcessPoolExecutor has no public way to stop a busy worker
+        processes = list((self.executor._processes or {}).values())
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+class SolveService:
+    """
+    Minimal HTTP/1.1 server on asyncio streams, one request per connection.
+
+    POST /solve/<knapsack|coloring> takes a JSON body {"input_data": str, "options": dict,
+    "deadline": seconds} and answers {"output_data": str, "latency_ms": float}.
+    GET /stats answers the stats of every pool.
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 64) -> None:
+        self.pools = {
+            problem: SolverPool(problem, workers, max_queue) for problem in PROBLEM_DIRS
+        }
+        self.connections = set()
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Reads one HTTP request from reader and writes its JSON answer to writer.
+        """
+        task = asyncio.current_task()
+        self.connections.add(task)
+        task.add_done_callback(self.connections.discard)
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            status, answer = await self.route(request_line, body)
+        except (
+            ValueError,
+            TypeError,
+            IndexError,
+            asyncio.IncompleteReadError,
+        ) as error:
+            status, answer = 400, {"error": str(error)}
+        except Exception as error:
+            # every connection gets an answer, whatever went wrong
+            status, answer = 500, {"error": f"{type(error).__name__}: {error}"}
+
+        payload = json.dumps(answer).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            "Connection: close\r\n\r\n".encode() + payload
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def route(self, request_line: list, body: bytes) -> Tuple[int, dict]:
+        """
+        Dispatches a request to its handler.
+
+        Args:
+            request_line (list): method, path and version of the request.
+            body (bytes): request body.
+
+        Returns:
+            status (int): HTTP status code.
+            answer (dict): JSON body of the answer.
+        """
+        method, path = request_line[0], request_line[1]
+        if method == "GET" and path == "/stats":
+            return 200, {problem: pool.stats() for problem, pool in self.pools.items()}
+
+        problem = path[len("/solve/") :]
+        if (
+            method != "POST"
+            or not path.startswith("/solve/")
+            or problem not in self.pools
+        ):
+            return 404, {"error": f"no route for {method} {path}"}
+        request = json.loads(body)
+        if not isinstance(request, dict):
+            return 400, {"error": "request body must be a JSON object"}
+        if not isinstance(request.get("input_data"), str):
+            return 400, {"error": "input_data must be a string"}
+        deadline = request.get("deadline")
+        return await self.pools[problem].solve(
+            request["input_data"],
+            dict(request.get("options", {})),
+            None if deadline is None else float(deadline),
+        )
+
+    async def serve(self, host: str, port: int, unix_path: str = None) -> None:
+        """
+        Warms every pool up and serves until SIGTERM or SIGINT, then stops every worker.
+
+        Args:
+            host (str): interface of the TCP server.
+            port (int): port of the TCP server.
+            unix_path (str): serve on this Unix socket instead of TCP.
+        """
+        await asyncio.gather(*(pool.warm_up() for pool in self.pools.values()))
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(self.handle, unix_path)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        print(
+            f"serving on {unix_path or f'{host}:{port}'}",
+            flush=True,
+        )
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(signal_number, stop.set)
+            except NotImplementedError:
+                # windows, KeyboardInterrupt still stops the service
+                pass
+        try:
+            async with server:
+                await stop.wait()
+        finally:
+            for pool in self.pools.values():
+                pool.shutdown()
+            # requests of stopped workers fail, let their connections get the answer
+            if self.connections:
+                await asyncio.wait(self.connections, timeout=1.0)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Builds an argument parser for the service CLI.
+
+    Returns:
+        parser (argparse.ArgumentParser): an argparse parser
+    """
+    parser = argparse.ArgumentParser(
+        description="Local HTTP service solving knapsack and coloring instances."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--unix", help="serve on this Unix socket instead of TCP")
+    parser.add_argument(
+        "--workers", type=int, default=2, help="worker processes of each problem"
+    )
+    parser.add_argument(
+        "--queue",
+        type=int,
+        default=64,
+        help="requests of each problem waiting for a worker before new ones are rejected",
+    )
+    return parser
+
+
+def main(args: argparse.Namespace) -> None:
+    service = SolveService(args.workers, args.queue)
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main(build_parser().parse_args())